@@ -1,27 +1,44 @@
+import json
+import logging
 import os
 import re
 import requests
 from typing import Tuple
 
+from answer_cache import MemoryCache, answer_key, get_answer_cache, make_key
+from http_client import get_client
+from medal_index import MedalIndex
 from rag import run_rag
+from telemetry import span
 from tools import newsapi_top_headlines, openweather_current
 
+logger = logging.getLogger(__name__)
+
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_MODEL = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
+# Permite apuntar a un stub local del endpoint de Gemini
+GOOGLE_API_BASE = os.getenv("GOOGLE_API_BASE", "https://generativelanguage.googleapis.com")
 
+SYSTEM_PROMPT = (
+    "Eres un asistente experto que responde preguntas sobre medallas olímpicas. "
+    "Puedes usar las herramientas NewsAPI y OpenWeather si necesitas información externa. "
+    "Si decides ejecutar una herramienta, responde con una línea EXACTA con el formato:"
+    "\nTOOL_CALL: ToolName|parameter\n" 
+    "Por ejemplo: TOOL_CALL: NewsAPI|Argentina futbol"
+    "\nSi no necesitas herramientas, entrega la respuesta final directamente."
+)
 
-def call_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL, temperature: float = 0.2, max_tokens: int = 250) -> str:
-    """Call Google Generative API (Gemini) via REST. Returns assistant text or raises on error.
-    """
-    if not GOOGLE_API_KEY:
-        raise RuntimeError("GOOGLE_API_KEY not set in environment")
+# Respuestas finales (clave con la huella de los datos) y resultados de tools,
+# estos con TTL propios más cortos porque cambian con más frecuencia.
+ANSWER_CACHE = get_answer_cache()
+TOOL_CACHE = MemoryCache()
+TOOL_CACHE_TTLS = {"NewsAPI": 15 * 60, "OpenWeather": 10 * 60}
 
-    # Use the v1 generateContent endpoint and pass the API key in the header (x-goog-api-key)
-    url = f"https://generativelanguage.googleapis.com/v1/models/{model}:generateContent"
-    headers = {"Content-Type": "application/json", "x-goog-api-key": GOOGLE_API_KEY}
-    # Build contents.parts similar to the curl example: include system and user as separate parts
-    payload = {
+
+def _gemini_payload(system: str, user: str) -> dict:
+    """Build contents.parts similar to the curl example: include system and user as separate parts."""
+    return {
         "contents": [
             {
                 "parts": [
@@ -33,7 +50,9 @@ def call_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL, temperat
 
     }
 
-    r = requests.post(url, json=payload, headers=headers, timeout=30)
+
+def _check_gemini_response(r) -> None:
+    """Raise a RuntimeError with a friendly message for non-2xx Gemini responses."""
     try:
         r.raise_for_status()
     except requests.HTTPError as he:
@@ -47,6 +66,27 @@ def call_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL, temperat
             raise RuntimeError("Google API rate limit (429). Intenta reducir la frecuencia o usar un modelo más pequeño.")
         raise RuntimeError(f"Google API error {code}: {text}")
 
+
+def call_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL, temperature: float = 0.2, max_tokens: int = 250) -> str:
+    """Call Google Generative API (Gemini) via REST. Returns assistant text or raises on error.
+    """
+    if not GOOGLE_API_KEY:
+        raise RuntimeError("GOOGLE_API_KEY not set in environment")
+
+    # Use the v1 generateContent endpoint and pass the API key in the header (x-goog-api-key)
+    url = f"{GOOGLE_API_BASE}/v1/models/{model}:generateContent"
+    headers = {"Content-Type": "application/json", "x-goog-api-key": GOOGLE_API_KEY}
+
+    # Shared pooled client (keep-alive, per-host limit). 429/503 are retried honoring Retry-After,
+    # but timeouts are not: the POST is slow and not idempotent, and retrying 30 s timeouts
+    # could block a request for minutes
+    payload = _gemini_payload(system, user)
+    with span("llm.generate", nbytes=len(system) + len(user)) as s:
+        r = get_client().post(url, json=payload, headers=headers, timeout=30,
+                              endpoint="gemini.generateContent", retry_on_exceptions=False)
+        _check_gemini_response(r)
+        s.add(items=1, nbytes=len(r.content))
+
     j = r.json()
     # Response shape can vary across versions. Try several fallbacks.
     try:
@@ -115,6 +155,48 @@ def call_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL, temperat
 TOOL_PATTERN = re.compile(r"TOOL_CALL:\s*(?P<tool>\w+)\s*\|\s*(?P<param>.+)", re.IGNORECASE)
 
 
+def stream_gemini_http(system: str, user: str, model: str = GOOGLE_MODEL):
+    """Stream Gemini output via streamGenerateContent (SSE). Yields text chunks as they arrive."""
+    if not GOOGLE_API_KEY:
+        raise RuntimeError("GOOGLE_API_KEY not set in environment")
+
+    url = f"{GOOGLE_API_BASE}/v1/models/{model}:streamGenerateContent?alt=sse"
+    headers = {"Content-Type": "application/json", "x-goog-api-key": GOOGLE_API_KEY}
+    # The span covers the whole stream; items counts the text chunks received
+    with span("llm.stream", nbytes=len(system) + len(user)) as s:
+        r = get_client().post(url, json=_gemini_payload(system, user), headers=headers, timeout=30, stream=True,
+                              endpoint="gemini.streamGenerateContent", retry_on_exceptions=False)
+        _check_gemini_response(r)
+        with r:
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                s.add(nbytes=len(line))
+                chunk = json.loads(line[len("data:"):])
+                for cand in chunk.get("candidates", [])[:1]:
+                    for part in (cand.get("content") or {}).get("parts", []):
+                        if isinstance(part, dict) and part.get("text"):
+                            s.add(items=1)
+                            yield part["text"]
+
+
+def run_tool(tool: str, param: str):
+    """Ejecuta una tool por nombre (sin distinguir mayúsculas). Devuelve (tool_name, param, result)."""
+    if tool.lower() == "newsapi":
+        res = _cached_tool("NewsAPI", param, lambda: newsapi_top_headlines(os.getenv("NEWSAPI_KEY"), param))
+        return ("NewsAPI", param, res)
+    if tool.lower() == "openweather":
+        res = _cached_tool("OpenWeather", param, lambda: openweather_current(os.getenv("OPENWEATHER_KEY"), param))
+        return ("OpenWeather", param, res)
+    return (tool, param, {"success": False, "error": "Unknown tool"})
+
+
+def find_tool_calls(text: str, limit: int = 2):
+    """Todas las líneas TOOL_CALL del texto (como mucho ``limit``) como lista de (tool, param)."""
+    calls = [(m.group("tool").strip(), m.group("param").strip()) for m in TOOL_PATTERN.finditer(text)]
+    return calls[:limit]
+
+
 def process_tool_call(text: str):
     """Detecta una petición de tool en el texto y ejecuta la tool. Devuelve (tool_name, param, result) o None."""
     m = TOOL_PATTERN.search(text)
@@ -122,35 +204,71 @@ def process_tool_call(text: str):
         return None
     tool = m.group("tool").strip()
     param = m.group("param").strip()
-    if tool.lower() == "newsapi":
-        res = newsapi_top_headlines(os.getenv("NEWSAPI_KEY"), param)
-        return ("NewsAPI", param, res)
-    if tool.lower() == "openweather":
-        res = openweather_current(os.getenv("OPENWEATHER_KEY"), param)
-        return ("OpenWeather", param, res)
-    return (tool, param, {"success": False, "error": "Unknown tool"})
+    return run_tool(tool, param)
+
+
+def _cached_tool(tool_name: str, param: str, call):
+    """Ejecuta una tool pasando por TOOL_CACHE; solo se guardan los resultados correctos."""
+    key = make_key(tool_name, param.lower())
+    res = TOOL_CACHE.get(key)
+    if res is None:
+        res = call()
+        if isinstance(res, dict) and res.get("success"):
+            TOOL_CACHE.set(key, res, ttl=TOOL_CACHE_TTLS.get(tool_name))
+    return res
+
+
+def _answer_ttl(history):
+    """TTL de una respuesta: el menor de las tools usadas (su resultado caduca antes); None -> el de la caché."""
+    ttls = [TOOL_CACHE_TTLS[h["tool"]] for h in history if h["tool"] in TOOL_CACHE_TTLS]
+    return min(ttls) if ttls else None
+
+
+def _answer_cache_key(user_query: str, df, index):
+    """Build the MedalIndex if needed and return (index, answer cache key)."""
+    if index is None and df is not None and not df.empty:
+        index = MedalIndex.from_df(df)
+    key = answer_key(user_query, index.fingerprint if index is not None else "", GOOGLE_MODEL, SYSTEM_PROMPT)
+    return index, key
 
 
-def answer_with_agent(user_query: str, collection, df) -> Tuple[str, list]:
+def _first_turn_prompt(rag_summary: str, user_query: str) -> str:
+    return f"Contexto RAG:\n{rag_summary}\n\nPregunta del usuario: {user_query}\n\nResponde o solicita TOOL_CALL si necesitas una herramienta."
+
+
+def _follow_up_prompt(tool_calls, user_query: str) -> str:
+    """Second-turn prompt with the output of every executed tool: list of (tool_name, param, result)."""
+    parts = []
+    for tool_name, param, tool_res in tool_calls:
+        tool_output_text = f"Tool {tool_name} output: {tool_res.get('result') if isinstance(tool_res, dict) else str(tool_res)}"
+        parts.append(f"El resultado de la herramienta ({tool_name}) para '{param}' es:\n{tool_output_text}\n\n")
+    instruction = "Usa este resultado" if len(tool_calls) == 1 else "Usa estos resultados"
+    follow_up_user = "".join(parts) + f"{instruction} y el contexto RAG para dar la respuesta final al usuario."
+    return follow_up_user + "\nPregunta original: " + user_query
+
+
+def answer_with_agent(user_query: str, collection, df, index=None, cache=ANSWER_CACHE) -> Tuple[str, list]:
     """High-level: run RAG to produce context, then use LLM to answer. The LLM can request tools using the special syntax:
     TOOL_CALL: ToolName|parameter
 
     The agent will execute at most 2 tool calls and ask the model to finish.
     Returns (final_text, history) where history contains intermediate tool results.
+    Final answers are cached in ``cache`` keyed on (normalized query, data fingerprint,
+    model, system prompt); pass cache=None to always call the LLM.
+    See agent_async.astream_answer for the streaming/asyncio version.
     """
+    index, key = _answer_cache_key(user_query, df, index)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return (hit["text"], hit["history"])
+
     # 1) run rag to get summary and docs
-    rag_summary = run_rag(user_query, collection, df)
+    rag_summary = run_rag(user_query, collection, df, index=index)
 
-    system = (
-        "Eres un asistente experto que responde preguntas sobre medallas olímpicas. "
-        "Puedes usar las herramientas NewsAPI y OpenWeather si necesitas información externa. "
-        "Si decides ejecutar una herramienta, responde con una línea EXACTA con el formato:"
-        "\nTOOL_CALL: ToolName|parameter\n" 
-        "Por ejemplo: TOOL_CALL: NewsAPI|Argentina futbol"
-        "\nSi no necesitas herramientas, entrega la respuesta final directamente."
-    )
+    system = SYSTEM_PROMPT
 
-    user = f"Contexto RAG:\n{rag_summary}\n\nPregunta del usuario: {user_query}\n\nResponde o solicita TOOL_CALL si necesitas una herramienta."
+    user = _first_turn_prompt(rag_summary, user_query)
 
     history = []
 
@@ -158,28 +276,27 @@ def answer_with_agent(user_query: str, collection, df) -> Tuple[str, list]:
         assistant = call_gemini_http(system, user)
     except Exception as e:
         # Log the error for diagnostics and fallback to RAG summary
-        print(f"⚠️ LLM call failed: {e}")
+        logger.warning("⚠️ LLM call failed: %s", e)
         return (f"(LLM no disponible) {rag_summary}", history)
 
     # check for tool call
     tool_call = process_tool_call(assistant)
     if not tool_call:
+        if cache is not None:
+            cache.set(key, {"text": assistant, "history": history})
         return (assistant, history)
 
     # execute tool and provide result back to model
     tool_name, param, tool_res = tool_call
     history.append({"tool": tool_name, "param": param, "result": tool_res})
 
-    tool_output_text = f"Tool {tool_name} output: {tool_res.get('result') if isinstance(tool_res, dict) else str(tool_res)}"
-
     # Ask model to finalize using tool output
-    follow_up_user = (
-        f"El resultado de la herramienta ({tool_name}) para '{param}' es:\n{tool_output_text}\n\n" 
-        "Usa este resultado y el contexto RAG para dar la respuesta final al usuario."
-    )
     try:
-        final = call_gemini_http(system, follow_up_user + "\nPregunta original: " + user_query)
+        final = call_gemini_http(system, _follow_up_prompt([tool_call], user_query))
+        if cache is not None:
+            # Con datos de NewsAPI/OpenWeather la respuesta no puede durar más que el resultado de la tool
+            cache.set(key, {"text": final, "history": history}, ttl=_answer_ttl(history))
         return (final, history)
     except Exception as e:
-        print(f"⚠️ LLM follow-up call failed: {e}")
+        logger.warning("⚠️ LLM follow-up call failed: %s", e)
         return (rag_summary, history)
@@ -0,0 +1,126 @@
+"""Versión asyncio del agente con tools en paralelo y respuestas en streaming.
+
+Mismo flujo que ``agent.answer_with_agent`` pero sin bloquear el event loop:
+- el RAG corre en un hilo mientras se abre (keep-alive) la conexión con Gemini;
+- todas las líneas TOOL_CALL de un mismo turno se ejecutan en paralelo;
+- los tokens de Gemini (``streamGenerateContent``) se entregan según llegan.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Tuple
+
+import agent
+from agent import (
+    ANSWER_CACHE,
+    SYSTEM_PROMPT,
+    _answer_cache_key,
+    _answer_ttl,
+    _first_turn_prompt,
+    _follow_up_prompt,
+    find_tool_calls,
+    run_tool,
+    stream_gemini_http,
+)
+from http_client import get_client
+from rag import run_rag
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _warm_gemini_connection():
+    """Abre la conexión TCP+TLS con Gemini en el pool del cliente compartido (errores ignorados)."""
+    try:
+        get_client().session.head(agent.GOOGLE_API_BASE, timeout=5)
+    except Exception:
+        pass
+
+
+async def astream_gemini(system: str, user: str) -> AsyncIterator[str]:
+    """Chunks de texto de Gemini como iterador asíncrono (la petición HTTP corre en un hilo)."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def pump():
+        try:
+            for chunk in stream_gemini_http(system, user):
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+    worker = loop.run_in_executor(None, pump)
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    await worker
+
+
+async def astream_answer(user_query: str, collection, df, index=None, cache=ANSWER_CACHE) -> AsyncIterator[Tuple[str, list]]:
+    """Genera ``(texto_acumulado, history)`` a medida que llega la respuesta del modelo.
+
+    El último elemento es la respuesta final. Las líneas TOOL_CALL no se muestran:
+    mientras el primer turno pide tools, el texto se retiene hasta el segundo turno.
+    """
+    index, key = _answer_cache_key(user_query, df, index)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            yield (hit["text"], hit["history"])
+            return
+
+    rag_summary, _ = await asyncio.gather(
+        asyncio.to_thread(run_rag, user_query, collection, df, index),
+        asyncio.to_thread(_warm_gemini_connection),
+    )
+
+    history = []
+    assistant = ""
+    try:
+        async for chunk in astream_gemini(SYSTEM_PROMPT, _first_turn_prompt(rag_summary, user_query)):
+            assistant += chunk
+            if "TOOL_CALL" not in assistant.upper():
+                yield (assistant, history)
+    except Exception as e:
+        logger.warning("⚠️ LLM call failed: %s", e)
+        yield (f"(LLM no disponible) {rag_summary}", history)
+        return
+
+    calls = find_tool_calls(assistant)
+    if not calls:
+        if cache is not None:
+            cache.set(key, {"text": assistant, "history": history})
+        yield (assistant, history)
+        return
+
+    # Todas las tools del turno en paralelo
+    results = await asyncio.gather(*(asyncio.to_thread(run_tool, tool, param) for tool, param in calls))
+    history.extend({"tool": name, "param": param, "result": res} for name, param, res in results)
+
+    final = ""
+    try:
+        async for chunk in astream_gemini(SYSTEM_PROMPT, _follow_up_prompt(results, user_query)):
+            final += chunk
+            yield (final, history)
+    except Exception as e:
+        logger.warning("⚠️ LLM follow-up call failed: %s", e)
+        yield (rag_summary, history)
+        return
+
+    if cache is not None:
+        cache.set(key, {"text": final, "history": history}, ttl=_answer_ttl(history))
+    yield (final, history)
+
+
+async def answer_with_agent_async(user_query: str, collection, df, index=None, cache=ANSWER_CACHE) -> Tuple[str, list]:
+    """Como ``agent.answer_with_agent`` pero asíncrono; devuelve solo la respuesta final."""
+    result = ("", [])
+    async for result in astream_answer(user_query, collection, df, index=index, cache=cache):
+        pass
+    return result
@@ -0,0 +1,122 @@
+"""Cachés de respuestas del agente y de resultados de tools.
+
+Dos backends con la misma interfaz (``get(key)`` / ``set(key, value, ttl=None)``):
+``MemoryCache`` (LRU en proceso, acotada en entradas) y ``SQLiteCache`` (persistente entre
+reinicios). Los valores deben ser serializables a JSON. La clave de una
+respuesta incluye la huella de los datos de medallas, así que cuando los datos
+cambian las entradas antiguas dejan de encontrarse sin invalidación explícita.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from embedding_cache import normalize_query
+
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+# Ruta de la base de datos SQLite; vacío -> caché en memoria
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+# Entradas como máximo de cada MemoryCache (respuestas y resultados de tools)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+
+
+def make_key(*parts) -> str:
+    """Clave estable (sha256) a partir de varias partes de texto."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def answer_key(query, data_fingerprint, model, system) -> str:
+    """Clave de una respuesta: (consulta normalizada, huella de datos, modelo, hash del prompt de sistema)."""
+    system_hash = hashlib.sha256(system.encode("utf-8")).hexdigest()
+    return make_key(normalize_query(query), data_fingerprint, model, system_hash)
+
+
+class MemoryCache:
+    """Caché en memoria con TTL por entrada y expulsión LRU por encima de ``max_entries``.
+
+    Una entrada caducada que nadie vuelve a leer no se queda para siempre: cada
+    ``set`` descarta las caducadas del extremo menos reciente antes de expulsar
+    por tamaño.
+    """
+
+    def __init__(self, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while self._entries:
+                oldest, (oldest_expires_at, _) = next(iter(self._entries.items()))
+                if oldest_expires_at >= now and len(self._entries) <= self.max_entries:
+                    break
+                del self._entries[oldest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """Caché persistente en SQLite con TTL por entrada; los valores se guardan como JSON."""
+
+    def __init__(self, path, ttl=ANSWER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+
+def get_answer_cache(path=ANSWER_CACHE_PATH, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES):
+    """SQLiteCache si se indica una ruta, MemoryCache en otro caso."""
+    return SQLiteCache(path, ttl) if path else MemoryCache(ttl, max_entries)
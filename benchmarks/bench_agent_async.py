@@ -0,0 +1,73 @@
+"""Tiempo hasta el primer token y capacidad con usuarios concurrentes: agente síncrono frente al asíncrono.
+
+Usa un stub local de Gemini (generateContent y streamGenerateContent) con
+latencia fija y un retardo por token.
+Uso: python benchmarks/bench_agent_async.py [usuarios] [latencia_s] [retardo_token_s]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import GeminiHandler, serve
+from benchmarks.synthetic import synthetic_medal_table
+
+QUERY = "¿Qué país ganó más oros?"
+REPLY = " ".join(["palabra"] * 40)
+
+
+async def _ttft_async(agent_async, collection, df, index):
+    start = time.perf_counter()
+    async for _ in agent_async.astream_answer(QUERY, collection, df, index=index, cache=None):
+        return time.perf_counter() - start
+
+
+async def _many_async(agent_async, collection, df, index, users):
+    await asyncio.gather(*(
+        agent_async.answer_with_agent_async(QUERY, collection, df, index=index, cache=None) for _ in range(users)
+    ))
+
+
+def main(users, latency, token_delay):
+    with serve(GeminiHandler, latency=latency, token_delay=token_delay, reply=lambda _: REPLY) as server:
+        import agent
+        import agent_async
+        from medal_index import MedalIndex
+        from vector_db import create_vector_db
+
+        agent.GOOGLE_API_KEY = "stub"
+        agent.GOOGLE_API_BASE = server.base_url
+        collection, df = create_vector_db(synthetic_medal_table(200), persist_dir="")
+        index = MedalIndex.from_df(df)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            agent.answer_with_agent(QUERY, collection, df, index=index, cache=None)
+            sync_ttft = time.perf_counter() - start
+            async_ttft = asyncio.run(_ttft_async(agent_async, collection, df, index))
+
+            # Un único worker síncrono (como un handler bloqueante) frente al event loop
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                list(pool.map(lambda _: agent.answer_with_agent(QUERY, collection, df, index=index, cache=None),
+                              range(users)))
+            sync_total = time.perf_counter() - start
+            start = time.perf_counter()
+            asyncio.run(_many_async(agent_async, collection, df, index, users))
+            async_total = time.perf_counter() - start
+
+    print(f"primer token   síncrono: {sync_ttft * 1000:8.1f} ms  asíncrono (streaming): {async_ttft * 1000:8.1f} ms")
+    print(f"{users} usuarios  síncrono (1 worker): {users / sync_total:6.2f} resp/s  asíncrono: {users / async_total:6.2f} resp/s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.3,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.02,
+    )
@@ -0,0 +1,130 @@
+"""Latencia de ``answer_with_agent`` con y sin caché de respuestas frente a un stub local de Gemini.
+
+También comprueba que un cambio en los datos (nueva huella) invalida la entrada
+y que una respuesta construida con una tool (OpenWeather, contra un stub local)
+caduca con el TTL de la tool y no con ``ANSWER_CACHE_TTL``, en el agente
+síncrono y en el asíncrono, y que ``MemoryCache`` no pasa de ``max_entries``
+ni guarda entradas caducadas que nadie vuelve a leer; si no, termina con código 1.
+Uso: python benchmarks/bench_answer_cache.py [latencia_llm_s]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import FlakyHandler, GeminiHandler, serve
+from benchmarks.synthetic import synthetic_medal_table
+
+QUERY = "¿Qué país ganó más oros?"
+TOOL_QUERY = "¿Qué tiempo hace hoy en París?"
+
+
+def _tool_reply(prompt):
+    """Primer turno: pide OpenWeather; segundo turno (con el resultado de la tool): respuesta final."""
+    if "El resultado de la herramienta" in prompt:
+        return "Respuesta final con el clima de París."
+    return "TOOL_CALL: OpenWeather|Paris"
+
+
+def check_tool_ttl(collection, df, index):
+    """True si la respuesta con tool sigue en caché antes del TTL de la tool y caduca justo después."""
+    import agent
+    import tools
+    from agent_async import answer_with_agent_async
+    from answer_cache import MemoryCache
+
+    runners = {
+        "síncrono": agent.answer_with_agent,
+        "asíncrono": lambda *args, **kwargs: asyncio.run(answer_with_agent_async(*args, **kwargs)),
+    }
+    ttl = agent.TOOL_CACHE_TTLS["OpenWeather"]
+    ok = True
+    with serve(GeminiHandler, reply=_tool_reply) as gemini, serve(FlakyHandler) as tool_server:
+        agent.GOOGLE_API_BASE = gemini.base_url
+        tools.OPENWEATHER_BASE = tool_server.base_url
+        os.environ["OPENWEATHER_KEY"] = "stub"
+        for name, run in runners.items():
+            agent.TOOL_CACHE.clear()
+            cache = MemoryCache()
+            _, history = run(TOOL_QUERY, collection, df, index=index, cache=cache)
+            _, key = agent._answer_cache_key(TOOL_QUERY, df, index)
+            now = time.time()
+            with mock.patch("time.time", return_value=now + ttl - 1):
+                fresh = cache.get(key) is not None
+            with mock.patch("time.time", return_value=now + ttl + 1):
+                expired = cache.get(key) is None
+            passed = bool(history) and fresh and expired
+            ok &= passed
+            print(f"respuesta con tool ({name}): caduca a los {ttl} s de OpenWeather -> {'✅' if passed else '⚠️ no'}")
+    return ok
+
+
+def check_memory_bounds(max_entries=100):
+    """True si ``MemoryCache`` expulsa por LRU al pasar de ``max_entries`` y descarta las caducadas en ``set``."""
+    from answer_cache import MemoryCache
+
+    cache = MemoryCache(ttl=60, max_entries=max_entries)
+    cache.set("frecuente", "valor")
+    for i in range(10 * max_entries):
+        cache.set(f"pregunta {i}", "valor")
+        cache.get("frecuente")
+    lru = len(cache) == max_entries and cache.get("frecuente") is not None and cache.get("pregunta 0") is None
+
+    now = time.time()
+    cache = MemoryCache(ttl=60, max_entries=max_entries)
+    for i in range(max_entries // 2):
+        cache.set(f"pregunta {i}", "valor")
+    with mock.patch("time.time", return_value=now + 61):
+        cache.set("nueva", "valor")
+    expired = len(cache) == 1
+
+    passed = lru and expired
+    print(f"MemoryCache acotada a {max_entries} entradas (LRU y caducadas en set) -> {'✅' if passed else '⚠️ no'}")
+    return passed
+
+
+def main(latency):
+    with serve(GeminiHandler, latency=latency) as server:
+        os.environ["GOOGLE_API_KEY"] = "stub"
+        import agent
+        from answer_cache import MemoryCache, SQLiteCache
+        from medal_index import MedalIndex
+        from vector_db import create_vector_db
+
+        agent.GOOGLE_API_KEY = "stub"
+        agent.GOOGLE_API_BASE = server.base_url
+        collection, df = create_vector_db(synthetic_medal_table(200), persist_dir="")
+        index = MedalIndex.from_df(df)
+
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {"memoria": MemoryCache(), "sqlite": SQLiteCache(os.path.join(directory, "answers.db"))}
+            for name, cache in backends.items():
+                timings = []
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(2):
+                        start = time.perf_counter()
+                        agent.answer_with_agent(QUERY, collection, df, index=index, cache=cache)
+                        timings.append(time.perf_counter() - start)
+                print(f"{name:<8} fallo: {timings[0] * 1000:8.2f} ms  acierto: {timings[1] * 1000:8.2f} ms")
+
+            changed = df.copy()
+            changed.loc[changed.index[0], "Gold"] += 1
+            calls_before = sum(server.hits.values())
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent.answer_with_agent(QUERY, collection, changed, index=MedalIndex.from_df(changed),
+                                        cache=backends["memoria"])
+            print(f"datos modificados -> nuevas llamadas al LLM: {sum(server.hits.values()) - calls_before}")
+
+        ok = check_tool_ttl(collection, df, index)
+    ok &= check_memory_bounds()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.5))
@@ -0,0 +1,81 @@
+"""Arranque de la CLI: ``python main.py --help`` y ``ask`` sobre un índice ya construido.
+
+Cada comando se lanza en un proceso nuevo. Además de la mediana del tiempo de
+pared, ``python -X importtime`` da el tiempo de import acumulado por paquete;
+el script falla (código 1) si una pregunta estructurada importa alguna
+dependencia pesada (chromadb, pandas, torch, Gradio, Playwright...) o si supera
+el presupuesto de tiempo. El índice es un snapshot Arrow en un directorio
+temporal, así que no hace falta el modelo de embeddings.
+Uso: python benchmarks/bench_cli_startup.py [repeticiones] [presupuesto_s]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEAVY = ("chromadb", "pandas", "torch", "sentence_transformers", "onnxruntime", "gradio", "playwright", "bs4")
+QUESTION = "¿Qué país ganó más oros?"
+
+
+def _run(args, env, importtime=False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["main.py", "--log-level", "WARNING"] + args
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, proc.stderr
+
+
+def import_times(stderr):
+    """A partir de la salida de ``-X importtime``: ({import de primer nivel: µs acumulados}, paquetes importados)."""
+    totals, packages = defaultdict(int), set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        packages.add(name.strip().split(".")[0])
+        # Los imports anidados (con sangría) ya cuentan en el acumulado de su padre
+        if not name.startswith("  "):
+            totals[name.strip().split(".")[0]] += int(cumulative)
+    return totals, packages
+
+
+def main(repeats, budget):
+    from benchmarks.synthetic import synthetic_medal_table
+    from snapshot import clean_medal_df, write_snapshot
+    from vector_db import SNAPSHOT_FILE
+
+    with tempfile.TemporaryDirectory() as persist_dir:
+        write_snapshot(clean_medal_df(synthetic_medal_table(200)), os.path.join(persist_dir, SNAPSHOT_FILE))
+        env = {**os.environ, "CHROMA_PATH": persist_dir}
+
+        help_times = [_run(["--help"], env)[0] for _ in range(repeats)]
+        ask_times = [_run(["ask", QUESTION], env)[0] for _ in range(repeats)]
+        _, stderr = _run(["ask", QUESTION], env, importtime=True)
+
+    totals, packages = import_times(stderr)
+    ask_median = statistics.median(ask_times)
+    print(f"--help: {statistics.median(help_times) * 1000:7.1f} ms   ask: {ask_median * 1000:7.1f} ms (mediana de {repeats})")
+    print("imports más caros en `ask`:")
+    for name, us in sorted(totals.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {name:<24} {us / 1000:8.1f} ms")
+
+    heavy = [name for name in HEAVY if name in packages]
+    if heavy:
+        print(f"⚠️ `ask` importa dependencias pesadas: {', '.join(heavy)}")
+    if ask_median > budget:
+        print(f"⚠️ `ask` supera el presupuesto de {budget:.2f} s")
+    return 1 if heavy or ask_median > budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    ))
@@ -0,0 +1,79 @@
+"""Backends de embeddings: arranque en frío, documentos/seg, latencia por consulta y memoria pico.
+
+Cada backend (torch, onnx, onnx-int8) se mide en un proceso nuevo con
+``EMBEDDING_BACKEND`` fijado, para que el arranque incluya imports y carga del
+modelo y la memoria pico no se mezcle entre backends.
+Uso: python benchmarks/bench_embeddings.py [n_docs] [hilos] [backend ...]
+"""
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERIES = ["¿Qué país ganó más oros?", "Países africanos en los Juegos", "¿Cómo le fue al país anfitrión?"]
+
+
+def _child(n_docs):
+    start = time.perf_counter()
+    from benchmarks.synthetic import synthetic_medal_table
+    from embeddings import get_embedding_function
+    from vector_db import build_documents, clean_medal_df
+
+    fn = get_embedding_function()
+    fn(QUERIES[:1])
+    cold = time.perf_counter() - start
+
+    documents, _, _ = build_documents(clean_medal_df(synthetic_medal_table(n_docs)))
+    start = time.perf_counter()
+    for i in range(0, len(documents), 256):
+        fn(documents[i:i + 256])
+    docs_per_sec = len(documents) / (time.perf_counter() - start)
+
+    times = []
+    for i in range(60):
+        start = time.perf_counter()
+        fn([f"{QUERIES[i % len(QUERIES)]} {i}"])
+        times.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "cold_s": cold,
+        "docs_per_sec": docs_per_sec,
+        "query_p50_ms": statistics.median(times) * 1000,
+        # ru_maxrss está en KB en Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main(n_docs, threads, backends):
+    for backend in backends:
+        env = {**os.environ, "EMBEDDING_BACKEND": backend, "EMBEDDING_THREADS": str(threads)}
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(n_docs)],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["error desconocido"])[-1]
+            print(f"{backend:<10} no disponible: {error}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{backend:<10} arranque en frío: {r['cold_s']:6.2f} s  {r['docs_per_sec']:8.1f} docs/s  "
+            f"consulta p50: {r['query_p50_ms']:6.2f} ms  memoria pico: {r['peak_rss_mb']:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(int(sys.argv[2]))
+    else:
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+            sys.argv[3:] or ["torch", "onnx", "onnx-int8"],
+        )
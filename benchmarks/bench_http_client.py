@@ -0,0 +1,95 @@
+"""Cliente HTTP compartido frente a ``requests`` sin sesión, contra un servidor local que inyecta 429.
+
+Mide la latencia media por petición (keep-alive frente a una conexión nueva cada
+vez) y la tasa de éxito con un porcentaje de respuestas 429. Comprueba además
+que las llamadas a Gemini (``retry_on_exceptions=False``) superan un 429 seguido
+de un 200 respetando ``Retry-After`` y que un timeout no se reenvía; si no,
+termina con código 1.
+Uso: python benchmarks/bench_http_client.py [n_requests] [fail_rate]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.stub_server import FlakyHandler, GeminiHandler, serve
+from http_client import HttpClient
+
+
+def _run(get, url, n):
+    ok = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        if get(url).status_code == 200:
+            ok += 1
+    return (time.perf_counter() - start) / n, ok / n
+
+
+def check_gemini_retries():
+    """429 + 200 en ``call_gemini_http`` y ``stream_gemini_http``; un timeout sin reenvío."""
+    import agent
+
+    ok = True
+    agent.GOOGLE_API_KEY = "stub"
+    calls = {
+        "generateContent": lambda: agent.call_gemini_http("sistema", "pregunta"),
+        "streamGenerateContent": lambda: "".join(agent.stream_gemini_http("sistema", "pregunta")),
+    }
+    for name, call in calls.items():
+        with serve(GeminiHandler, rate_limited=1, retry_after=1) as server:
+            agent.GOOGLE_API_BASE = server.base_url
+            start = time.perf_counter()
+            try:
+                text = call()
+            except RuntimeError:
+                text = ""
+            elapsed = time.perf_counter() - start
+            hits = sum(server.hits.values())
+        # Retry-After: 1 -> el reintento espera el segundo indicado, no el backoff
+        passed = text == "Respuesta del stub." and hits == 2 and elapsed >= 1.0
+        ok &= passed
+        print(f"gemini {name:<22} 429 + 200: {hits} peticiones, {elapsed:5.2f} s -> {'✅' if passed else '⚠️ no'}")
+
+    client = HttpClient(backoff_base=0.01)
+    # El servidor escribe la respuesta cuando el cliente ya cerró: BrokenPipeError esperado
+    with serve(FlakyHandler, latency=0.2) as server, contextlib.redirect_stderr(io.StringIO()):
+        try:
+            client.post(server.base_url + "/slow", timeout=0.05, retry_on_exceptions=False)
+        except requests.Timeout:
+            pass
+        time.sleep(0.3)
+        hits = sum(server.hits.values())
+    passed = hits == 1
+    ok &= passed
+    print(f"POST con timeout y retry_on_exceptions=False: {hits} petición(es) -> {'✅' if passed else '⚠️ no'}")
+    return ok
+
+
+def main(n, fail_rate):
+    client = HttpClient(backoff_base=0.01)
+    with serve(FlakyHandler, latency=0.002) as server:
+        url = server.base_url + "/v2/top-headlines"
+        bare, _ = _run(lambda u: requests.get(u, timeout=6), url, n)
+        pooled, _ = _run(lambda u: client.get(u, timeout=6, endpoint="stub"), url, n)
+        print(f"sin fallos      requests.get: {bare * 1000:6.2f} ms/pet  cliente compartido: {pooled * 1000:6.2f} ms/pet")
+
+        server.fail_rate = fail_rate
+        _, bare_ok = _run(lambda u: requests.get(u, timeout=6), url, n)
+        _, pooled_ok = _run(lambda u: client.get(u, timeout=6, endpoint="stub"), url, n)
+        print(f"{fail_rate:.0%} de 429      éxito requests.get: {bare_ok:6.1%}  cliente compartido: {pooled_ok:6.1%}")
+
+    report = client.latency_report()["stub"]
+    print(f"histograma 'stub': {report['count']} observaciones, media {report['sum'] / report['count'] * 1000:.2f} ms")
+    for bound, cumulative in report["buckets"]:
+        print(f"  <= {bound:>6}: {cumulative}")
+
+    return 0 if check_gemini_retries() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 0.3))
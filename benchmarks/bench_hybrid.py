@@ -0,0 +1,135 @@
+"""Recall@k de la búsqueda densa, BM25 y la híbrida (RRF), y latencia de BM25.
+
+Un conjunto de consultas etiquetadas con el país (y, si la nombran, la edición)
+cuyas filas deberían recuperarse, sobre la tabla de nombres reales y tres
+ediciones de ``bench_query_planner``. Las consultas usan alias ("Kenia",
+"EEUU", "Holanda"), códigos COI y cifras exactas, justo donde MiniLM falla.
+Recall@k = fracción de las filas relevantes que aparecen entre los k primeros
+documentos, en media sobre las consultas. Después mide lo que la fusión añade
+a cada consulta y la construcción y la latencia de ``BM25Index.search`` sobre
+tablas sintéticas grandes.
+Uso: python benchmarks/bench_hybrid.py [k ...]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telemetry
+from benchmarks.bench_query_planner import labeled_table
+from benchmarks.synthetic import synthetic_medal_table
+from bm25 import BM25Index
+from medal_index import MedalIndex
+from rag import HYBRID_CANDIDATES, _retrieve
+from vector_db import create_vector_db
+
+# (consulta, país, edición o None si vale cualquiera)
+LABELED = [
+    ("Kenia", "Kenya", None),
+    ("Atletas de Kenia en el maratón", "Kenya", None),
+    ("EEUU", "United States", None),
+    ("El equipo de Estados Unidos", "United States", None),
+    ("GBR", "Great Britain", None),
+    ("Reino Unido en ciclismo", "Great Britain", None),
+    ("Holanda en patinaje", "Netherlands", None),
+    ("NED", "Netherlands", None),
+    ("Corea del Sur en tiro con arco", "South Korea", None),
+    ("KOR", "South Korea", None),
+    ("Japón en judo", "Japan", None),
+    ("Italia en esgrima", "Italy", None),
+    ("Alemania en remo", "Germany", None),
+    ("Nigeria", "Nigeria", None),
+    ("Níger", "Niger", None),
+    ("Australia en natación", "Australia", None),
+    ("China en halterofilia", "China", None),
+    ("País con 44 platas", "United States", None),
+    ("29 bronces", "Great Britain", None),
+    ("26 platas", "France", None),
+    ("Noruega en 2022", "Norway", "2022 Winter"),
+    ("España en 2020", "Spain", "2020 Summer"),
+    ("Francia 2024", "France", "2024 Summer"),
+]
+
+LATENCY_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def relevant_rows(index, nation, edition):
+    return {
+        i for i, n in enumerate(index.nations)
+        if n == nation and (edition is None or index.editions[i] == edition)
+    }
+
+
+def recall_at(k, retrieve, index):
+    """Media de |relevantes ∩ top-k| / |relevantes| y las consultas con recall 0."""
+    rows_by_doc = {index.document(i): i for i in range(len(index))}
+    recalls, misses = [], []
+    for query, nation, edition in LABELED:
+        relevant = relevant_rows(index, nation, edition)
+        found = {rows_by_doc.get(doc) for doc in retrieve(query, k)} & relevant
+        recalls.append(len(found) / len(relevant))
+        if not found:
+            misses.append(query)
+    return statistics.mean(recalls), misses
+
+
+def _mean_us(snapshot):
+    return snapshot["sum"] / snapshot["count"] * 1e6
+
+
+def _latencies_us(fn, queries, repeat=20):
+    times = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            times.append((time.perf_counter() - start) * 1e6)
+    return times
+
+
+def main(ks):
+    df = labeled_table()
+    index = MedalIndex.from_df(df)
+    with contextlib.redirect_stdout(io.StringIO()):
+        collection, _ = create_vector_db(df, persist_dir="")
+
+    methods = {
+        "densa": lambda q, k: _retrieve([q], collection, None, n_results=k)[0],
+        "BM25": lambda q, k: [index.document(i) for i in index.lexical.search(q, k)[0]],
+        "híbrida": lambda q, k: _retrieve([q], collection, None, n_results=k, index=index)[0],
+    }
+    print(f"{len(LABELED)} consultas etiquetadas, {len(index)} filas")
+    for k in ks:
+        line = []
+        for name, retrieve in methods.items():
+            recall, misses = recall_at(k, retrieve, index)
+            line.append(f"{name}: {recall:6.1%} ({len(misses)} sin acierto)")
+        print(f"recall@{k:<3} " + "   ".join(line))
+
+    # Coste añadido por la búsqueda híbrida: BM25 + fusión (span "rag.lexical")
+    queries = [q for q, _, _ in LABELED]
+    telemetry.reset()
+    for q in queries * 20:
+        _retrieve([q], collection, None, index=index)
+    stages = telemetry.report()
+    print(f"media por consulta  Chroma ({HYBRID_CANDIDATES} candidatos): {_mean_us(stages['rag.retrieve']):8.1f} µs"
+          f"  BM25 + RRF: {_mean_us(stages['rag.lexical']):8.1f} µs")
+
+    for n_rows in LATENCY_SIZES:
+        big = MedalIndex.from_df(synthetic_medal_table(n_rows))
+        start = time.perf_counter()
+        lexical = BM25Index.from_medal_index(big)
+        build = time.perf_counter() - start
+        sample = [big.nations[i] for i in range(0, n_rows, max(n_rows // 20, 1))]
+        sample += ["Nation con 7 oros", "12 platas y 3 bronces", "Puesto 42"]
+        times = _latencies_us(lambda q: lexical.search(q, 20), sample)
+        print(f"BM25 n={n_rows:>9}  construcción: {build:7.2f} s  "
+              f"búsqueda  mediana: {statistics.median(times):8.1f} µs  peor: {max(times):8.1f} µs")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1, 3, 5])
@@ -0,0 +1,61 @@
+"""Compara filas/seg de la ingesta por lotes frente al bucle fila a fila original.
+
+Uso: python benchmarks/bench_ingest.py [n_rows ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+
+from benchmarks.synthetic import synthetic_medal_table
+from embeddings import get_embedding_function
+from vector_db import COLLECTION_NAME, clean_medal_df, create_vector_db
+
+
+def per_row_ingest(df, embedding_fn):
+    """Bucle original: un ``collection.add`` (y un forward del modelo) por fila."""
+    collection = chromadb.Client().get_or_create_collection(
+        name=f"bench_per_row_{len(df)}", embedding_function=embedding_fn
+    )
+    for idx, row in df.iterrows():
+        text = f"{row['Nation']} ganó {row['Gold']} oros, {row['Silver']} platas y {row['Bronze']} bronces."
+        collection.add(
+            documents=[text],
+            ids=[str(idx)],
+            metadatas=[{"nation": row["Nation"], "rank": int(row["Rank"])}]
+        )
+
+
+def main(sizes):
+    embedding_fn = get_embedding_function()
+    for n in sizes:
+        df = synthetic_medal_table(n)
+
+        start = time.perf_counter()
+        per_row_ingest(clean_medal_df(df), embedding_fn)
+        per_row = time.perf_counter() - start
+
+        try:
+            chromadb.Client().delete_collection(COLLECTION_NAME)
+        except Exception:
+            pass
+        start = time.perf_counter()
+        create_vector_db(df, persist_dir="")
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        create_vector_db(df, persist_dir="")
+        rerun = time.perf_counter() - start
+
+        print(
+            f"n={n:>6}  fila a fila: {n / per_row:8.1f} filas/s  "
+            f"por lotes: {n / batched:8.1f} filas/s  "
+            f"re-ejecución: {n / rerun:8.1f} filas/s"
+        )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [200, 1000])
@@ -0,0 +1,68 @@
+"""Microbenchmark de consultas/seg: ranking con pandas por consulta frente a ``MedalIndex``.
+
+Uso: python benchmarks/bench_medal_index.py [n_rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_medal_table
+from medal_index import MedalIndex, clean_country_name
+from rag import extract_medal_type, run_rag
+
+QUERIES = [
+    "¿Qué país ganó más oros?",
+    "¿Quién tiene más platas?",
+    "Ranking de bronces",
+    "¿Qué nación obtuvo más medallas totales?",
+]
+
+
+class NullCollection:
+    """Colección sin embeddings: aísla el coste del ranking."""
+
+    def query(self, query_texts, n_results):
+        return {"documents": [[] for _ in query_texts]}
+
+
+def legacy_ranking(query, df):
+    """Ranking original: copia, limpieza y ordenación completa del DataFrame en cada consulta."""
+    medal_type = extract_medal_type(query)
+    df = df.copy()
+    df.columns = [c.strip().capitalize() for c in df.columns]
+    df = df[~df["Nation"].astype(str).str.contains("Total|–", case=False, na=False)]
+    df = df[df["Gold"].apply(lambda x: str(x).isdigit())]
+    for col in ["Gold", "Silver", "Bronze"]:
+        df[col] = df[col].astype(int)
+    df["Total"] = df["Gold"] + df["Silver"] + df["Bronze"]
+    top_df = df.sort_values(by=medal_type, ascending=False).head(5)
+    top_df["Nation"] = top_df["Nation"].apply(clean_country_name)
+    return top_df
+
+
+def _qps(fn, seconds=1.0):
+    n = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() - start < seconds:
+            fn(QUERIES[n % len(QUERIES)])
+            n += 1
+    return n / (time.perf_counter() - start)
+
+
+def main(sizes):
+    collection = NullCollection()
+    for n in sizes:
+        df = synthetic_medal_table(n)
+        index = MedalIndex.from_df(df)
+        before = _qps(lambda q: legacy_ranking(q, df))
+        after = _qps(lambda q: run_rag(q, collection, df, index=index, cache=None))
+        print(f"n={n:>7}  antes: {before:10.1f} consultas/s  después: {after:10.1f} consultas/s")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [200, 10_000, 100_000])
@@ -0,0 +1,53 @@
+"""Coste de cada camino de la caché de páginas frente a un servidor local con ETag.
+
+Reproduce el flujo de ``gradio_app.setup(refresh=True)``: solo se parsea (y, por
+tanto, se embebe) cuando la página cambió. Un 304 o una entrada dentro del TTL
+no cuestan parseo.
+Uso: python benchmarks/bench_page_cache.py [n_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import PageHandler, serve
+from benchmarks.synthetic import medal_table_html, synthetic_medal_table
+from page_cache import PageCache
+from scraper import parse_medal_table_fast
+
+
+def refresh(cache, url, stats):
+    """Revalida la página y parsea solo si cambió."""
+    start = time.perf_counter()
+    page = cache.get(url)
+    if page.changed:
+        parse_medal_table_fast(page.body)
+        stats["parses"] += 1
+    return page.status, time.perf_counter() - start
+
+
+def main(n_rows):
+    df = synthetic_medal_table(n_rows).sort_values("Rank")
+    pages = {"/medals": medal_table_html(df, filler=8000).encode("utf-8")}
+    stats = {"parses": 0}
+    with serve(PageHandler, pages=pages) as server, tempfile.TemporaryDirectory() as directory:
+        url = server.base_url + "/medals"
+        steps = [
+            ("primera descarga", lambda: PageCache(directory, ttl=60)),
+            ("dentro del TTL", lambda: PageCache(directory, ttl=60)),
+            ("TTL vencido, sin cambios", lambda: PageCache(directory, ttl=0)),
+            ("TTL vencido, con cambios", lambda: PageCache(directory, ttl=0)),
+            ("modo offline", lambda: PageCache(directory, offline=True)),
+        ]
+        for label, make_cache in steps:
+            if label == "TTL vencido, con cambios":
+                pages["/medals"] = pages["/medals"].replace(b"Nation 0000000", b"Nation 9999999")
+            status, elapsed = refresh(make_cache(), url, stats)
+            print(f"{label:<28} {status:<13} {elapsed * 1000:8.2f} ms  parseos: {stats['parses']}")
+        print(f"peticiones al servidor: {server.hits['/medals']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,40 @@
+"""Parseo de páginas de medallas guardadas: BeautifulSoup + pd.read_html frente al parser lxml.
+
+Uso: python benchmarks/bench_parse.py [n_rows ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import medal_table_html, synthetic_medal_table
+from scraper import parse_medal_table, parse_medal_table_fast
+
+# ~600 KB de texto antes de la tabla, como una página real de Wikipedia
+FILLER = 8000
+
+
+def _per_call(fn, html, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    for n in sizes:
+        df = synthetic_medal_table(n).sort_values("Rank")
+        html = medal_table_html(df, filler=FILLER).encode("utf-8")
+        classic = _per_call(lambda h: parse_medal_table(h.decode("utf-8")), html)
+        fast = _per_call(parse_medal_table_fast, html)
+        print(
+            f"n={n:>6} ({len(html) / 1024:7.0f} KB)  bs4+read_html: {classic * 1000:8.1f} ms  "
+            f"lxml: {fast * 1000:8.1f} ms  x{classic / fast:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 1000, 10_000])
@@ -0,0 +1,66 @@
+"""Latencia p50 de preguntas repetidas con y sin caché de embeddings, y throughput de ``run_rag_many``.
+
+Uso: python benchmarks/bench_query_cache.py [n_queries]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_medal_table
+from embedding_cache import QueryEmbeddingCache
+from medal_index import MedalIndex
+from rag import run_rag, run_rag_many
+from vector_db import create_vector_db
+
+QUESTIONS = [
+    # Preguntas sin intención estructurada: pasan por embeddings + Chroma
+    "¿Cómo le fue al país anfitrión?",
+    "Delegaciones con buen rendimiento en natación",
+    "Países africanos en los Juegos",
+    "¿Qué delegación europea sorprendió?",
+]
+
+
+def _p50(fn, queries):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(n_queries):
+    collection, df = create_vector_db(synthetic_medal_table(200), persist_dir="")
+    index = MedalIndex.from_df(df)
+    repeated = [QUESTIONS[i % len(QUESTIONS)] for i in range(n_queries)]
+    cache = QueryEmbeddingCache()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        no_cache = _p50(lambda q: run_rag(q, collection, df, index=index, cache=None), repeated)
+        cached = _p50(lambda q: run_rag(q, collection, df, index=index, cache=cache), repeated)
+
+        start = time.perf_counter()
+        for q in repeated:
+            run_rag(q, collection, df, index=index, cache=QueryEmbeddingCache())
+        one_by_one = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_rag_many(repeated, collection, df, index=index, cache=QueryEmbeddingCache())
+        batched = time.perf_counter() - start
+
+    print(f"p50 pregunta repetida  sin caché: {no_cache * 1000:7.2f} ms  con caché: {cached * 1000:7.2f} ms")
+    print(f"caché: {cache.stats()}")
+    print(
+        f"{n_queries} consultas  una a una: {n_queries / one_by_one:8.1f} consultas/s  "
+        f"run_rag_many: {n_queries / batched:8.1f} consultas/s"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,127 @@
+"""Precisión del enrutado del planificador de consultas y latencia frente a la búsqueda vectorial.
+
+Un conjunto etiquetado de preguntas (español e inglés) con su intención esperada
+sobre una tabla con nombres reales y tres ediciones. Después compara la latencia
+de responder las preguntas estructuradas desde el ``MedalIndex`` con la del
+camino anterior (embedding + ``collection.query`` + ranking). Termina con
+código 1 si alguna pregunta del conjunto etiquetado se enruta mal.
+Uso: python benchmarks/bench_query_planner.py [repeticiones]
+"""
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medal_index import MedalIndex
+from query_planner import execute, plan_query
+from rag import _answer, _retrieve
+from vector_db import create_vector_db
+
+NATIONS = [
+    ("United States", 40, 44, 42), ("China", 40, 27, 24), ("Japan", 20, 12, 13),
+    ("Australia", 18, 19, 16), ("France", 16, 26, 22), ("Netherlands", 15, 7, 12),
+    ("Great Britain", 14, 22, 29), ("South Korea", 13, 9, 10), ("Italy", 12, 13, 15),
+    ("Germany", 12, 13, 8), ("Kenya", 4, 2, 5), ("Spain", 5, 4, 9), ("Niger", 0, 0, 0),
+    ("Nigeria", 0, 0, 0), ("Norway", 16, 8, 13),
+]
+
+LABELED = [
+    ("¿Qué país ganó más oros?", "top"),
+    ("¿Quién tiene más platas?", "top"),
+    ("Ranking de bronces", "top"),
+    ("¿Qué nación obtuvo más medallas totales?", "top"),
+    ("Which country won the most golds?", "top"),
+    ("Top 10 en medallas de oro", "top"),
+    ("Los 5 primeros países en bronces", "top"),
+    ("best 3 in silver medals", "top"),
+    ("¿Cuántas medallas ganó Kenia?", "nation"),
+    ("¿Cuántos oros tiene España?", "nation"),
+    ("Medallas de Estados Unidos", "nation"),
+    ("How many medals did Nigeria win?", "nation"),
+    ("Resultados de USA", "nation"),
+    ("España vs Francia", "compare"),
+    ("Compara Japón, China y Australia en oros", "compare"),
+    ("¿Quién ganó más platas, Italia o Alemania?", "compare"),
+    ("Netherlands and Great Britain bronze medals", "compare"),
+    ("Países del puesto 3 al 8", "rank_range"),
+    ("Posiciones 1-5 en platas", "rank_range"),
+    ("ranks 2 to 4 in gold", "rank_range"),
+    ("Entre los puestos 5 y 10", "rank_range"),
+    ("¿Qué países tienen más oros que Francia?", "more_than"),
+    ("Countries with more silver medals than Japan", "more_than"),
+    ("Países con más de 15 oros", "more_than"),
+    ("Naciones con al menos 20 medallas", "more_than"),
+    ("¿Qué país ganó más oros en 2020?", "top"),
+    ("Medallas de Noruega en los Juegos de invierno de 2022", "nation"),
+    ("Top 3 en bronces en Tokio 2020", "top"),
+    ("¿Cómo le fue al país anfitrión?", "search"),
+    ("Delegaciones con buen rendimiento en natación", "search"),
+    ("Países africanos en los Juegos", "search"),
+    ("¿Qué delegación europea sorprendió?", "search"),
+    ("Cuéntame algo sobre la ceremonia de apertura", "search"),
+    # Palabras de ranking o de medallas sueltas sin pedir un ranking
+    ("Tell me more about the Olympics", "search"),
+    ("Dime más sobre el país anfitrión", "search"),
+    ("¿Cuándo se entregan las medallas?", "search"),
+    ("¿Cuál fue el mejor momento de los Juegos?", "search"),
+    ("Who was the first athlete to light the cauldron?", "search"),
+    ("Historia de las medallas de oro olímpicas", "search"),
+]
+
+
+def labeled_table():
+    """Tabla con nombres reales repetida en tres ediciones (cifras desplazadas por edición)."""
+    frames = []
+    for shift, edition in enumerate(("2020 Summer", "2022 Winter", "2024 Summer")):
+        rows = [(n, max(g - 3 * shift, 0), s, b) for n, g, s, b in NATIONS]
+        df = pd.DataFrame(rows, columns=["Nation", "Gold", "Silver", "Bronze"])
+        df["Total"] = df["Gold"] + df["Silver"] + df["Bronze"]
+        df["Rank"] = df["Gold"].rank(method="min", ascending=False).astype(int)
+        df["Edition"] = edition
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def routing_accuracy(index):
+    errors = []
+    for query, expected in LABELED:
+        got = plan_query(query, index).intent
+        if got != expected:
+            errors.append((query, expected, got))
+    return 1 - len(errors) / len(LABELED), errors
+
+
+def _median_us(fn, queries, repeat):
+    times = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def main(repeat):
+    df = labeled_table()
+    index = MedalIndex.from_df(df)
+    accuracy, errors = routing_accuracy(index)
+    print(f"enrutado: {accuracy:.1%} de {len(LABELED)} preguntas")
+    for query, expected, got in errors:
+        print(f"  ✗ {query!r}: esperado {expected}, obtenido {got}")
+
+    collection, df_clean = create_vector_db(df, persist_dir="")
+    structured = [q for q, intent in LABELED if intent != "search"]
+    planner = _median_us(lambda q: execute(plan_query(q, index), index), structured, repeat)
+    vector = _median_us(
+        lambda q: _answer(q, _retrieve([q], collection, None)[0], index), structured, repeat
+    )
+    print(f"mediana por consulta estructurada  planificador: {planner:9.1f} µs  embedding + Chroma: {vector:9.1f} µs")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,71 @@
+"""Coste de ``refresh.refresh_once`` por sondeo y reintento de un cambio cuya ingesta falló.
+
+Contra un servidor local con ETag (``stub_server.PageHandler``) y un almacén
+persistente en un directorio temporal:
+1. primera indexación;
+2. sondeo sin cambios (304, sin parseo ni ingesta);
+3. la página cambia pero ``create_vector_db`` falla (la caché ya guardó el cuerpo nuevo);
+4. el siguiente sondeo recibe 304 y aun así aplica el cambio pendiente;
+5. sondeo sin cambios.
+Termina con código 1 si algún paso no hace lo esperado.
+Uso: python benchmarks/bench_refresh.py [n_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import PageHandler, serve
+from benchmarks.synthetic import medal_table_html, synthetic_medal_table
+from page_cache import PageCache
+from refresh import refresh_once
+from vector_db import load_medal_index
+
+NEW_NATION = "Nation 9999999"
+
+
+def main(n_rows):
+    df = synthetic_medal_table(n_rows).sort_values("Rank")
+    pages = {"/medals": medal_table_html(df).encode("utf-8")}
+    failures = 0
+    with serve(PageHandler, pages=pages) as server, \
+            tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as persist_dir:
+        url = server.base_url + "/medals"
+        cache = PageCache(cache_dir, ttl=0)
+
+        def step(label, expect_update, fail=False):
+            nonlocal failures
+            start = time.perf_counter()
+            if fail:
+                with mock.patch("refresh.create_vector_db", side_effect=RuntimeError("ingesta interrumpida")):
+                    try:
+                        result = refresh_once(cache, url, persist_dir)
+                    except RuntimeError:
+                        result = None
+            else:
+                result = refresh_once(cache, url, persist_dir)
+            elapsed = time.perf_counter() - start
+            ok = (result is not None) == expect_update
+            failures += not ok
+            print(f"{label:<40} {'aplicado' if result is not None else 'sin cambios':<12} "
+                  f"{elapsed * 1000:9.2f} ms  {'✅' if ok else '⚠️ inesperado'}")
+
+        step("primera indexación", expect_update=True)
+        step("sondeo sin cambios (304)", expect_update=False)
+        pages["/medals"] = pages["/medals"].replace(b"Nation 0000000", NEW_NATION.encode())
+        step("página cambiada, la ingesta falla", expect_update=False, fail=True)
+        step("siguiente sondeo (304): reintento", expect_update=True)
+        step("sondeo sin cambios (304)", expect_update=False)
+
+        index = load_medal_index(persist_dir)
+        applied = index is not None and index.find(NEW_NATION) is not None
+        failures += not applied
+        print(f"cambio aplicado en el almacén: {'✅' if applied else '⚠️ no'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,103 @@
+"""Recall, memoria y latencia: Chroma (HNSW) frente a ``NumpyRetriever`` en float32/float16/int8.
+
+Embeddings sintéticos de 384 dimensiones (como all-MiniLM-L6-v2) agrupados en
+clústeres, y consultas que son perturbaciones de documentos. La referencia es
+el top-k exacto en float32; se mide el recall@k de cada backend frente a ella y
+el solapamiento del backend NumPy con lo que devuelve Chroma. Termina con
+código 1 si el recall@k de algún dtype frente al top-k exacto queda por debajo
+de ``MIN_RECALL``.
+Uso: python benchmarks/bench_retriever.py [n_docs ...]
+"""
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numpy_retriever import NumpyRetriever
+
+DIM = 384
+K = 5
+N_QUERIES = 200
+CHROMA_BATCH = 4096
+# Recall@K mínimo frente al top-k exacto: float32 no pierde ningún vecino; float16 solo
+# intercambia algún empate casi exacto en el puesto K (0.999 con 100 000 documentos)
+MIN_RECALL = {"float32": 1.0, "float16": 0.995, "int8": 0.95}
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def synthetic_embeddings(n_docs, seed=0):
+    """Documentos alrededor de centros aleatorios y consultas cercanas a documentos, normalizados."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(n_docs // 20, 1), DIM)).astype(np.float32)
+    docs = centers[rng.integers(0, len(centers), n_docs)] + 0.6 * rng.standard_normal((n_docs, DIM)).astype(np.float32)
+    queries = docs[rng.integers(0, n_docs, N_QUERIES)] + 0.4 * rng.standard_normal((N_QUERIES, DIM)).astype(np.float32)
+    docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return docs, queries
+
+
+def _recall(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def _p50_ms(fn, queries):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(sizes):
+    import chromadb
+
+    client = chromadb.Client()
+    failures = []
+    for n_docs in sizes:
+        docs, queries = synthetic_embeddings(n_docs)
+        ids = [str(i) for i in range(n_docs)]
+        documents = [f"doc {i}" for i in range(n_docs)]
+        truth = np.argsort(-(docs @ queries.T), axis=0)[:K].T.tolist()
+        truth = [[str(i) for i in t] for t in truth]
+
+        before = _rss_mb()
+        # Vectores normalizados: la distancia l2 por defecto ordena igual que el coseno
+        collection = client.create_collection(f"bench_{uuid.uuid4().hex[:8]}", embedding_function=None)
+        for start in range(0, n_docs, CHROMA_BATCH):
+            collection.add(ids=ids[start:start + CHROMA_BATCH], embeddings=docs[start:start + CHROMA_BATCH],
+                           documents=documents[start:start + CHROMA_BATCH])
+        chroma_rss = _rss_mb() - before
+        chroma_found = collection.query(query_embeddings=queries, n_results=K)["ids"]
+        chroma_ms = _p50_ms(lambda q: collection.query(query_embeddings=[q], n_results=K), queries[:50])
+
+        print(f"n={n_docs:>7}  Chroma  recall@{K}: {_recall(chroma_found, truth):.3f}  "
+              f"p50: {chroma_ms:7.3f} ms  RSS añadida: {chroma_rss:7.1f} MB")
+        for dtype in ("float32", "float16", "int8"):
+            retriever = NumpyRetriever(docs, documents, ids=ids, dtype=dtype)
+            found = retriever.query(query_embeddings=queries, n_results=K)["ids"]
+            ms = _p50_ms(lambda q: retriever.query(query_embeddings=[q], n_results=K), queries[:50])
+            recall = _recall(found, truth)
+            if recall < MIN_RECALL[dtype]:
+                failures.append(f"n={n_docs} {dtype}: recall@{K} {recall:.3f} < {MIN_RECALL[dtype]}")
+            print(f"{'':9} NumPy {dtype:<7} recall@{K}: {recall:.3f}  "
+                  f"(vs Chroma {_recall(found, chroma_found):.3f})  p50: {ms:7.3f} ms  "
+                  f"matriz: {retriever.nbytes / 2 ** 20:7.2f} MB")
+        client.delete_collection(collection.name)
+
+    for failure in failures:
+        print(f"⚠️ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(a) for a in sys.argv[1:]] or [200, 10_000, 100_000]))
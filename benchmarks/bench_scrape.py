@@ -0,0 +1,54 @@
+"""Crawl de N ediciones: lanzamientos secuenciales de Chromium frente al scraper asíncrono.
+
+Las páginas son fixtures locales (``file://``), así que no hace falta red. La
+referencia secuencial llama directamente a ``scrape_with_browser`` (un Chromium
+por página), sin pasar por el intento estático de ``scrape_medal_table``.
+Uso: python benchmarks/bench_scrape.py [n_editions] [concurrency]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import medal_table_html, synthetic_medal_table
+from scraper import scrape_editions, scrape_with_browser
+
+
+def write_fixtures(directory, n_editions, n_rows=90):
+    """Escribe una página por edición y devuelve {edición: url file://}."""
+    urls = {}
+    for i in range(n_editions):
+        edition = f"{1896 + 4 * i} Summer"
+        df = synthetic_medal_table(n_rows, seed=i).sort_values("Rank")
+        path = Path(directory) / f"{1896 + 4 * i}_Summer_Olympics_medal_table.html"
+        path.write_text(medal_table_html(df, edition), encoding="utf-8")
+        urls[edition] = path.as_uri()
+    return urls
+
+
+def main(n_editions, concurrency):
+    with tempfile.TemporaryDirectory() as directory:
+        urls = write_fixtures(directory, n_editions)
+
+        start = time.perf_counter()
+        for url in urls.values():
+            scrape_with_browser(url)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        combined = scrape_editions(urls, concurrency=concurrency)
+        concurrent = time.perf_counter() - start
+
+    print(
+        f"{n_editions} ediciones ({len(combined)} filas)  "
+        f"secuencial: {sequential:6.2f} s  asíncrono (x{concurrency}): {concurrent:6.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    c = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    main(n, c)
@@ -0,0 +1,114 @@
+"""Tamaño, tiempo de carga y RSS del snapshot: CSV + ``MedalIndex.from_df`` frente a Arrow memory-mapped.
+
+Tablas sintéticas de varias ediciones (200 países por edición). Cada carga se
+mide en un proceso nuevo para que la RSS no arrastre las cargas anteriores.
+Antes comprueba que una tabla sin columna Rank se limpia, valida y guarda con
+``NO_RANK`` en todas las filas; si no, termina con código 1.
+Uso: python benchmarks/bench_snapshot.py [n_rows ...]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+NATIONS_PER_EDITION = 200
+
+
+def _rss_mb():
+    """RSS actual del proceso (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def multi_edition_table(n_rows):
+    import pandas as pd
+    from benchmarks.synthetic import synthetic_medal_table
+
+    editions = max(n_rows // NATIONS_PER_EDITION, 1)
+    frames = []
+    for e in range(editions):
+        df = synthetic_medal_table(NATIONS_PER_EDITION, seed=e)
+        df["Edition"] = f"{1896 + e} Summer"
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _child(mode, path):
+    import pandas as pd
+    from medal_index import MedalIndex
+    from snapshot import read_snapshot
+
+    before = _rss_mb()
+    start = time.perf_counter()
+    if mode == "csv":
+        index = MedalIndex.from_df(pd.read_csv(path))
+    else:
+        index = MedalIndex.from_table(read_snapshot(path))
+    index.top("Gold", 5)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "rss_mb": _rss_mb() - before}))
+
+
+def _run(mode, path):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, path],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def check_no_rank():
+    """Una tabla sin Rank pasa ``validate_medal_df`` y el snapshot y el índice conservan ``NO_RANK``."""
+    from benchmarks.synthetic import synthetic_medal_table
+    from medal_index import MedalIndex
+    from snapshot import NO_RANK, clean_medal_df, read_snapshot, validate_medal_df, write_snapshot
+
+    raw = synthetic_medal_table(50).drop(columns=["Rank"])
+    try:
+        df = validate_medal_df(clean_medal_df(raw))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "medals.arrow")
+            write_snapshot(df, path)
+            index = MedalIndex.from_table(read_snapshot(path))
+            passed = bool((index.ranks == NO_RANK).all()) and len(index.top("Gold", 5)) == 5
+    except ValueError as e:
+        print(f"tabla sin Rank rechazada: {e}")
+        passed = False
+    print(f"tabla sin columna Rank -> {'✅' if passed else '⚠️ no'}")
+    return passed
+
+
+def main(sizes):
+    from snapshot import clean_medal_df, validate_medal_df, write_snapshot
+
+    if not check_no_rank():
+        return 1
+    for n_rows in sizes:
+        df = validate_medal_df(clean_medal_df(multi_edition_table(n_rows)))
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "medals.csv")
+            arrow_path = os.path.join(tmp, "medals.arrow")
+            df.to_csv(csv_path, index=False)
+            write_snapshot(df, arrow_path)
+            csv, arrow = _run("csv", csv_path), _run("arrow", arrow_path)
+            print(
+                f"n={len(df):>9}  tamaño CSV: {os.path.getsize(csv_path) / 2 ** 20:7.2f} MB  "
+                f"Arrow: {os.path.getsize(arrow_path) / 2 ** 20:7.2f} MB"
+            )
+            print(
+                f"{'':12}carga CSV + from_df: {csv['seconds'] * 1000:8.1f} ms ({csv['rss_mb']:6.1f} MB RSS)  "
+                f"Arrow mmap + from_table: {arrow['seconds'] * 1000:8.1f} ms ({arrow['rss_mb']:6.1f} MB RSS)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        sys.exit(main([int(a) for a in sys.argv[1:]] or [1_000, 100_000, 1_000_000]))
@@ -0,0 +1,50 @@
+"""Tiempo hasta la primera respuesta: arranque en frío frente a arranque en caliente.
+
+Cada arranque se mide en un proceso nuevo para incluir imports y carga del modelo.
+Uso: python benchmarks/bench_startup.py [n_rows]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERY = "¿Qué país ganó más oros?"
+
+
+def _child(mode, persist_dir, n_rows):
+    from rag import run_rag
+    from vector_db import create_vector_db, load_vector_db
+
+    if mode == "cold":
+        from benchmarks.synthetic import synthetic_medal_table
+        collection, df = create_vector_db(synthetic_medal_table(n_rows), persist_dir=persist_dir)
+    else:
+        collection, df = load_vector_db(persist_dir)
+    run_rag(QUERY, collection, df)
+
+
+def _run(mode, persist_dir, n_rows):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, __file__, "--child", mode, persist_dir, str(n_rows)],
+        check=True, cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def main(n_rows):
+    with tempfile.TemporaryDirectory() as persist_dir:
+        cold = _run("cold", persist_dir, n_rows)
+        warm = _run("warm", persist_dir, n_rows)
+    print(f"n={n_rows}  frío: {cold:6.2f} s  caliente: {warm:6.2f} s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,40 @@
+"""Fixtures HTML guardadas en disco para que los benchmarks no dependan de Wikipedia.
+
+``fixture_html(n_rows)`` devuelve una página con la misma estructura que la tabla
+de medallas de Wikipedia (``synthetic.medal_table_html``, semilla fija). La
+primera vez se genera y se guarda en ``benchmarks/fixtures/``; a partir de ahí
+todas las ejecuciones parsean exactamente los mismos bytes.
+"""
+import hashlib
+import os
+
+from benchmarks.synthetic import medal_table_html, synthetic_medal_table
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_SIZES = (200, 1_000, 10_000)
+# ~600 KB de texto antes de la tabla, como una página real de Wikipedia
+FILLER = 8000
+
+
+def fixture_path(n_rows):
+    return os.path.join(FIXTURE_DIR, f"medal_table_{n_rows}.html")
+
+
+def fixture_html(n_rows):
+    """Bytes de la página de ``n_rows`` filas (se genera y guarda si no existe)."""
+    path = fixture_path(n_rows)
+    if not os.path.exists(path):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        df = synthetic_medal_table(n_rows).sort_values("Rank")
+        html = medal_table_html(df, title=f"Medal table ({n_rows} entries)", filler=FILLER).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(html)
+        os.replace(tmp, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def fixture_digest(n_rows):
+    """sha256 de la fixture, para comprobar que dos ejecuciones usan la misma página."""
+    return hashlib.sha256(fixture_html(n_rows)).hexdigest()
@@ -0,0 +1,120 @@
+"""Prueba de carga: N clientes concurrentes preguntando a la app.
+
+Sin ``--url`` se ejerce en proceso el mismo camino que ``gradio_app.answer`` sin
+GOOGLE_API_KEY (``run_rag`` en hilos sobre estado compartido de solo lectura),
+con y sin el worker de embeddings con micro-batching. Con ``--url`` se lanzan
+las peticiones contra una app Gradio en marcha usando ``gradio_client``.
+Informa de p50/p95/p99 y consultas por segundo.
+
+Uso: python benchmarks/loadtest.py [clientes] [peticiones_por_cliente] [--url http://127.0.0.1:7860]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTIONS = [
+    # Preguntas sin intención estructurada: pasan por embeddings + Chroma
+    "¿Cómo le fue al país anfitrión?",
+    "Delegaciones con buen rendimiento en natación",
+    "Países africanos en los Juegos",
+    "¿Qué delegación europea sorprendió?",
+]
+
+
+def _query(client, i):
+    # Sufijo distinto por petición para que la caché de embeddings no oculte la codificación
+    return f"{QUESTIONS[i % len(QUESTIONS)]} #{client}-{i}"
+
+
+def _report(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{label:<28} p50: {q[49] * 1000:8.1f} ms  p95: {q[94] * 1000:8.1f} ms  "
+        f"p99: {q[98] * 1000:8.1f} ms  {len(latencies) / elapsed:8.1f} consultas/s"
+    )
+
+
+async def _run_clients(call, clients, requests_per_client):
+    """Cada cliente lanza sus peticiones en serie; los clientes van en paralelo."""
+    latencies = []
+
+    async def client(c):
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            await call(c, i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+def in_process(clients, requests_per_client):
+    import rag
+    from benchmarks.synthetic import synthetic_medal_table
+    from embedding_cache import QueryEmbeddingCache
+    from embedding_worker import EmbeddingBatcher
+    from medal_index import MedalIndex
+    from embeddings import get_embedding_function
+    from vector_db import create_vector_db
+
+    collection, df = create_vector_db(synthetic_medal_table(200), persist_dir="")
+    index = MedalIndex.from_df(df)
+    # Como la cola de Gradio: tantos hilos como peticiones simultáneas
+    loop_executor = ThreadPoolExecutor(max_workers=clients)
+
+    def make_call(cache):
+        async def call(c, i):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(loop_executor, rag.run_rag, _query(c, i), collection, df, index, cache)
+        return call
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag.set_query_encoder(None)
+        direct = asyncio.run(_run_clients(make_call(QueryEmbeddingCache()), clients, requests_per_client))
+        batcher = EmbeddingBatcher(get_embedding_function())
+        rag.set_query_encoder(batcher)
+        batched = asyncio.run(_run_clients(make_call(QueryEmbeddingCache()), clients, requests_per_client))
+        rag.set_query_encoder(None)
+    loop_executor.shutdown()
+
+    _report("codificación por petición", *direct)
+    _report("EmbeddingBatcher", *batched)
+    print(f"batcher: {batcher.stats()}")
+
+
+def remote(url, clients, requests_per_client):
+    from gradio_client import Client
+
+    gradio_clients = [Client(url, verbose=False) for _ in range(clients)]
+
+    async def call(c, i):
+        await asyncio.to_thread(gradio_clients[c].predict, _query(c, i), api_name="/answer")
+
+    _report(url, *asyncio.run(_run_clients(call, clients, requests_per_client)))
+
+
+def main(argv):
+    url = None
+    if "--url" in argv:
+        pos = argv.index("--url")
+        url = argv[pos + 1]
+        argv = argv[:pos] + argv[pos + 2:]
+    clients = int(argv[0]) if len(argv) > 0 else 16
+    requests_per_client = int(argv[1]) if len(argv) > 1 else 20
+    if url:
+        remote(url, clients, requests_per_client)
+    else:
+        in_process(clients, requests_per_client)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+"""Perfil de una sola petición RAG y desglose por etapas de la telemetría.
+
+Abre el almacén persistido (o indexa una tabla sintética en memoria si no hay),
+hace una petición de calentamiento y perfila la siguiente con cProfile o
+pyinstrument. Después muestra las etapas registradas por ``telemetry`` y el
+coste de un span vacío.
+Uso: python benchmarks/profile_request.py ["consulta"] [cprofile|pyinstrument] [fichero de salida]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telemetry
+from benchmarks.synthetic import synthetic_medal_table
+from medal_index import MedalIndex
+from rag import run_rag
+from vector_db import create_vector_db, load_medal_index, load_vector_db
+
+
+def span_overhead_us(n=100_000):
+    """Microsegundos por span vacío (con registro en la etapa)."""
+    start = time.perf_counter()
+    for _ in range(n):
+        with telemetry.span("bench.empty"):
+            pass
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main(query, kind, path):
+    warm = load_vector_db()
+    if warm is not None:
+        collection, df_clean = warm
+        index = load_medal_index() or MedalIndex.from_df(df_clean)
+    else:
+        collection, df_clean = create_vector_db(synthetic_medal_table(200), persist_dir=None)
+        index = MedalIndex.from_df(df_clean)
+
+    run_rag(query, collection, df_clean, index=index)
+    telemetry.reset()
+    with telemetry.profile(kind, path) as capture:
+        run_rag(query, collection, df_clean, index=index)
+    print(capture.report)
+    if path:
+        print(f"Perfil guardado en {path}")
+
+    print(f"{'etapa':<16} {'n':>4} {'ms':>9} {'items':>7} {'bytes':>9}")
+    for name, snap in telemetry.report().items():
+        print(f"{name:<16} {snap['count']:>4} {snap['sum'] * 1000:9.3f} {snap['items']:>7} {snap['bytes']:>9}")
+    print(f"Coste por span: {span_overhead_us():.2f} µs")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "Países africanos en los Juegos",
+        sys.argv[2] if len(sys.argv) > 2 else "cprofile",
+        sys.argv[3] if len(sys.argv) > 3 else None,
+    )
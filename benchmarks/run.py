@@ -0,0 +1,278 @@
+"""Suite de benchmarks reproducible del pipeline completo, sin red.
+
+Casos, cada uno en varios tamaños:
+- ``parse``: parseo lxml de las fixtures HTML guardadas (``fixtures.py``).
+- ``clean``: limpieza y validación de tablas sintéticas de 1k a 1M filas.
+- ``ingest``: ``create_vector_db`` en memoria desde cero.
+- ``retrieve``: ``collection.query`` con embeddings de consulta ya calculados.
+- ``run_rag``: preguntas estructuradas y semánticas, con la caché de embeddings vacía.
+- ``agent``: ``answer_with_agent`` de punta a punta (RAG, Gemini, tool y segundo
+  turno) contra los stubs locales de Gemini y de las tools (``stub_server.py``).
+
+El resultado es un JSON con el commit, el entorno y, por caso y tamaño, la
+mediana, el mínimo, elementos/seg y el tiempo por etapa de ``telemetry``:
+
+  python benchmarks/run.py [--case parse,clean] [--quick] [--out resultados.json]
+  python benchmarks/run.py compare antes.json despues.json [--threshold 0.1]
+
+``compare`` marca como regresión una mediana más de ``threshold`` peor y
+termina con código 1 si hay alguna.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import telemetry
+from benchmarks.fixtures import fixture_digest, fixture_html
+from benchmarks.stub_server import FlakyHandler, GeminiHandler, serve
+from benchmarks.synthetic import synthetic_medal_table
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+QUERIES = [
+    "¿Qué país ganó más oros?",
+    "Top 10 en bronces",
+    "Nation 0000042",
+    "Países africanos en los Juegos",
+    "¿Cómo le fue al país anfitrión?",
+    "Medallas en deportes acuáticos",
+]
+
+# prepare() corre antes de cada repetición sin medirse; run() es lo que se mide
+Case = namedtuple("Case", "name sizes quick_sizes setup")
+Prepared = namedtuple("Prepared", "prepare run items")
+
+
+def _drop_collection():
+    """Borra la colección en memoria para que cada ingesta empiece de cero."""
+    import chromadb
+    from chromadb.errors import NotFoundError
+    from vector_db import COLLECTION_NAME
+
+    with contextlib.suppress(NotFoundError, ValueError):
+        chromadb.Client().delete_collection(COLLECTION_NAME)
+
+
+def _indexed(n_rows):
+    from medal_index import MedalIndex
+    from vector_db import create_vector_db
+
+    _drop_collection()
+    collection, df = create_vector_db(synthetic_medal_table(n_rows), persist_dir=None)
+    return collection, df, MedalIndex.from_df(df)
+
+
+def setup_parse(n_rows, stack):
+    from scraper import parse_medal_table_fast
+
+    html = fixture_html(n_rows)
+    return Prepared(None, lambda: parse_medal_table_fast(html), n_rows)
+
+
+def setup_clean(n_rows, stack):
+    from snapshot import clean_medal_df, validate_medal_df
+
+    raw = synthetic_medal_table(n_rows)
+    return Prepared(None, lambda: validate_medal_df(clean_medal_df(raw)), n_rows)
+
+
+def setup_ingest(n_rows, stack):
+    from vector_db import create_vector_db
+
+    raw = synthetic_medal_table(n_rows)
+    return Prepared(_drop_collection, lambda: create_vector_db(raw, persist_dir=None), n_rows)
+
+
+def setup_retrieve(n_rows, stack):
+    from embeddings import get_embedding_function
+
+    collection, _, _ = _indexed(n_rows)
+    query_embeddings = get_embedding_function()(QUERIES)
+    return Prepared(None, lambda: collection.query(query_embeddings=query_embeddings, n_results=5), len(QUERIES))
+
+
+def setup_run_rag(n_rows, stack):
+    from rag import QUERY_CACHE, run_rag
+
+    collection, df, index = _indexed(n_rows)
+
+    def run():
+        for q in QUERIES:
+            run_rag(q, collection, df, index=index)
+
+    return Prepared(QUERY_CACHE.clear, run, len(QUERIES))
+
+
+def _stub_reply(prompt):
+    """Primer turno: pide una tool; segundo turno (con el resultado de la tool): respuesta final."""
+    if "El resultado de la herramienta" in prompt:
+        return "Respuesta final con los datos de medallas y el clima."
+    return "TOOL_CALL: OpenWeather|Paris"
+
+
+def setup_agent(n_rows, stack):
+    import agent
+    import tools
+
+    gemini = stack.enter_context(serve(GeminiHandler, reply=_stub_reply))
+    tool_server = stack.enter_context(serve(FlakyHandler))
+    agent.GOOGLE_API_KEY = "stub"
+    agent.GOOGLE_API_BASE = gemini.base_url
+    tools.OPENWEATHER_BASE = tool_server.base_url
+    os.environ["OPENWEATHER_KEY"] = "stub"
+
+    from rag import QUERY_CACHE
+
+    collection, df, index = _indexed(n_rows)
+
+    def prepare():
+        QUERY_CACHE.clear()
+        agent.TOOL_CACHE.clear()
+
+    def run():
+        for q in QUERIES:
+            agent.answer_with_agent(q, collection, df, index=index, cache=None)
+
+    return Prepared(prepare, run, len(QUERIES))
+
+
+CASES = [
+    Case("parse", (200, 1_000, 10_000), (200,), setup_parse),
+    Case("clean", (1_000, 100_000, 1_000_000), (1_000,), setup_clean),
+    Case("ingest", (200, 2_000), (200,), setup_ingest),
+    Case("retrieve", (200, 10_000), (200,), setup_retrieve),
+    Case("run_rag", (200, 10_000), (200,), setup_run_rag),
+    Case("agent", (200,), (200,), setup_agent),
+]
+
+
+def measure(prepared, repeats, warmup=1):
+    """Tiempos (s) de ``repeats`` ejecuciones tras ``warmup`` sin medir, y el tiempo por etapa."""
+    for _ in range(warmup):
+        if prepared.prepare:
+            prepared.prepare()
+        prepared.run()
+    telemetry.reset()
+    times = []
+    for _ in range(repeats):
+        if prepared.prepare:
+            prepared.prepare()
+        start = time.perf_counter()
+        prepared.run()
+        times.append(time.perf_counter() - start)
+    stages = {name: snap["sum"] / repeats * 1000 for name, snap in telemetry.report().items()}
+    return times, stages
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    from embeddings import embedding_id
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "embedding": embedding_id(),
+    }
+
+
+def run_suite(names, quick, repeats):
+    results = []
+    for case in CASES:
+        if names and case.name not in names:
+            continue
+        for size in case.quick_sizes if quick else case.sizes:
+            with contextlib.ExitStack() as stack:
+                prepared = case.setup(size, stack)
+                times, stages = measure(prepared, repeats)
+            median = statistics.median(times)
+            result = {
+                "case": case.name,
+                "size": size,
+                "repeats": repeats,
+                "median_ms": median * 1000,
+                "min_ms": min(times) * 1000,
+                "items_per_sec": prepared.items / median if median else None,
+                "stages_ms": stages,
+            }
+            if case.name == "parse":
+                result["fixture_sha256"] = fixture_digest(size)
+            results.append(result)
+            print(f"{case.name:<9} n={size:>9}  mediana: {result['median_ms']:10.3f} ms  "
+                  f"mín: {result['min_ms']:10.3f} ms  {result['items_per_sec']:12.1f} elem/s")
+    return results
+
+
+def compare(old_path, new_path, threshold):
+    """Imprime la mediana de cada caso en los dos ficheros; devuelve el número de regresiones."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    before = {(r["case"], r["size"]): r for r in old["results"]}
+    regressions = 0
+    print(f"{old['env']['commit']} -> {new['env']['commit']}")
+    for r in new["results"]:
+        prev = before.get((r["case"], r["size"]))
+        if prev is None:
+            print(f"{r['case']:<9} n={r['size']:>9}  {r['median_ms']:10.3f} ms  (nuevo)")
+            continue
+        ratio = r["median_ms"] / prev["median_ms"] if prev["median_ms"] else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  ⚠️ regresión"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            mark = "  ✅ mejora"
+        print(f"{r['case']:<9} n={r['size']:>9}  {prev['median_ms']:10.3f} -> {r['median_ms']:10.3f} ms  "
+              f"x{ratio:5.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline (sin red).")
+    sub = parser.add_subparsers(dest="command")
+    cmp_parser = sub.add_parser("compare", help="compara dos ficheros de resultados")
+    cmp_parser.add_argument("old")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--case", default="", help="casos separados por comas (por defecto, todos)")
+    parser.add_argument("--quick", action="store_true", help="solo el tamaño más pequeño de cada caso")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--out", help="fichero JSON (por defecto benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return 1 if compare(args.old, args.new, args.threshold) else 0
+
+    env = environment()
+    results = run_suite({n for n in args.case.split(",") if n}, args.quick, args.repeats)
+    out = args.out or os.path.join(RESULTS_DIR, f"{env['commit']}{'-dirty' if env['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"env": env, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Servidores HTTP locales que sustituyen a los servicios externos en benchmarks y pruebas manuales."""
+import contextlib
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Sirve ``server.pages[path]`` con ETag/Last-Modified y responde 304 a peticiones condicionales."""
+
+    LAST_MODIFIED = "Wed, 21 Aug 2024 10:00:00 GMT"
+
+    def do_GET(self):
+        body = self.server.pages.get(self.path)
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeminiHandler(BaseHTTPRequestHandler):
+    """Stub de ``/v1/models/{model}:generateContent`` y ``:streamGenerateContent?alt=sse``.
+
+    Responde con ``server.reply(prompt_text)`` (por defecto, un texto fijo) tras
+    ``server.latency`` segundos. En streaming envía una palabra por evento SSE
+    cada ``server.token_delay`` segundos. ``server.hits`` cuenta las llamadas por ruta.
+    Las ``server.rate_limited`` primeras llamadas reciben 429 con
+    ``Retry-After: server.retry_after``.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if sum(self.server.hits.values()) <= getattr(self.server, "rate_limited", 0):
+            body = b'{"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}'
+            self.send_response(429)
+            self.send_header("Retry-After", str(getattr(self.server, "retry_after", 0)))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        parts = [p.get("text", "") for c in payload.get("contents", []) for p in c.get("parts", [])]
+        time.sleep(getattr(self.server, "latency", 0.0))
+        reply = getattr(self.server, "reply", None)
+        text = reply("\n".join(parts)) if reply else "Respuesta del stub."
+        if ":streamGenerateContent" in self.path:
+            self._stream(text)
+            return
+        # Sin streaming la respuesta llega cuando el modelo ha generado todos los tokens
+        time.sleep(getattr(self.server, "token_delay", 0.0) * len(text.split(" ")))
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for i, word in enumerate(text.split(" ")):
+            token = word if i == 0 else " " + word
+            event = {"candidates": [{"content": {"parts": [{"text": token}]}}]}
+            self.wfile.write(b"data: " + json.dumps(event).encode("utf-8") + b"\r\n\r\n")
+            self.wfile.flush()
+            time.sleep(getattr(self.server, "token_delay", 0.0))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Endpoint genérico (GET/POST) con keep-alive que inyecta latencia y errores 429.
+
+    ``server.latency`` añade un retardo fijo; ``server.fail_rate`` es la
+    probabilidad de responder 429 con ``Retry-After: server.retry_after``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        time.sleep(getattr(self.server, "latency", 0.0))
+        if self.server.rng.random() < getattr(self.server, "fail_rate", 0.0):
+            body = b'{"error": "rate limited"}'
+            self.send_response(429)
+            self.send_header("Retry-After", str(getattr(self.server, "retry_after", 0)))
+        else:
+            body = b'{"status": "ok", "articles": [], "weather": [{"description": "soleado"}], "main": {"temp": 21}}'
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve(handler, **state):
+    """Arranca ``handler`` en un puerto libre de 127.0.0.1 y devuelve el servidor.
+
+    Los argumentos con nombre quedan como atributos del servidor (p. ej. ``pages={...}``).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.hits = {}
+    server.rng = random.Random(0)
+    for name, value in state.items():
+        setattr(server, name, value)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,63 @@
+"""Generador de tablas de medallas sintéticas para los benchmarks."""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_medal_table(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Devuelve un DataFrame con el mismo formato que ``scraper.scrape_medal_table``."""
+    rng = np.random.default_rng(seed)
+    gold = rng.integers(0, 50, n_rows)
+    silver = rng.integers(0, 50, n_rows)
+    bronze = rng.integers(0, 50, n_rows)
+    total = gold + silver + bronze
+    order = np.argsort(-gold, kind="stable")
+    rank = np.empty(n_rows, dtype=int)
+    rank[order] = np.arange(1, n_rows + 1)
+    return pd.DataFrame({
+        "Rank": rank,
+        "Nation": [f"Nation {i:07d}" for i in range(n_rows)],
+        "Gold": gold,
+        "Silver": silver,
+        "Bronze": bronze,
+        "Total": total,
+    })
+
+
+def medal_table_html(df: pd.DataFrame, title: str = "Medal table", filler: int = 0) -> str:
+    """Página HTML con la misma estructura que una tabla de medallas de Wikipedia.
+
+    Los empates de Rank se agrupan con ``rowspan``, las naciones van en ``<th scope="row">``
+    y la fila de totales en ``<tfoot>``. Incluye una imagen y una hoja de estilos para
+    que el bloqueo de recursos del scraper tenga algo que bloquear. ``filler`` añade
+    párrafos de texto antes de la tabla para imitar el tamaño de una página real.
+    """
+    rows = []
+    ranks = df["Rank"].tolist()
+    for i, row in enumerate(df.itertuples(index=False)):
+        cells = []
+        if i == 0 or ranks[i] != ranks[i - 1]:
+            span = 1
+            while i + span < len(ranks) and ranks[i + span] == ranks[i]:
+                span += 1
+            attr = f' rowspan="{span}"' if span > 1 else ""
+            cells.append(f"<td{attr}>{row.Rank}</td>")
+        cells.append(
+            f'<th scope="row"><span class="flagicon"><img src="flag.png" width="23" height="15"></span>'
+            f' <a href="#">{row.Nation}</a></th>'
+        )
+        cells.extend(f"<td>{v}</td>" for v in (row.Gold, row.Silver, row.Bronze, row.Total))
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    totals = "".join(f"<th>{int(df[c].sum())}</th>" for c in ("Gold", "Silver", "Bronze", "Total"))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title><link rel=\"stylesheet\" href=\"style.css\"></head><body>"
+        f"<h1>{title}</h1><p>Texto introductorio.</p>"
+        + "<p>Lorem ipsum dolor sit amet, <a href=\"#\">consectetur</a> adipiscing elit.</p>" * filler
+        + '<table class="wikitable sortable plainrowheaders" style="text-align:center">'
+        f"<caption>{title}</caption><tbody>"
+        '<tr><th scope="col">Rank</th><th scope="col">NOC</th><th scope="col">Gold</th>'
+        '<th scope="col">Silver</th><th scope="col">Bronze</th><th scope="col">Total</th></tr>'
+        + "".join(rows)
+        + f'</tbody><tfoot><tr><th colspan="2">Totals ({len(df)} entries)</th>{totals}</tr></tfoot>'
+        "</table></body></html>"
+    )
@@ -0,0 +1,192 @@
+"""Índice léxico BM25 en memoria y fusión con la búsqueda densa.
+
+MiniLM es flojo con los tokens exactos (nombres de países, alias, cifras):
+"Kenia" o "29 bronces" no recuperan bien el documento de la fila correcta.
+``BM25Index`` indexa por fila del ``MedalIndex`` el mismo texto que va a Chroma
+más el total, la posición y el código COI y los alias del país
+(``country_matcher.NATION_ALIASES``). El peso BM25 de cada (término, fila) se
+precalcula al construir el índice, así que una consulta solo suma las listas de
+sus términos: el coste depende de la longitud de esas listas, no del tamaño de
+la tabla. ``reciprocal_rank_fusion`` combina después el ranking léxico con el
+denso de Chroma.
+"""
+import re
+
+import numpy as np
+
+from country_matcher import NATION_ALIASES, fold
+
+# Constante de la fusión RRF (Cormack et al.): 60 es el valor habitual
+RRF_K = 60
+# Entradas que recorre como mucho una consulta, repartidas entre sus términos (las de más peso)
+MAX_POSTINGS = 10_000
+
+STOPWORDS = frozenset(
+    "a al como con cual cuales cuanta cuantas cuanto cuantos de del el en es la las lo los o para por que "
+    "se su sus un una y "
+    "an and did does how in is many much of the to what which who".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+# Palabras de ``MedalIndex.document`` y de "Total N medallas. Puesto N." comunes a todas las filas
+FIXED_WORDS = ("gano", "oro", "plata", "bronce", "total", "medalla", "puesto")
+
+
+def _stem(word):
+    """Plural en -s muy simple: "oros" -> "oro", "bronces" -> "bronce", "golds" -> "gold"."""
+    if len(word) > 3 and word.endswith("s") and not word.isdigit():
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Términos de ``text``: minúsculas sin acentos, sin palabras vacías y con el plural recortado."""
+    # fold() recorre carácter a carácter; los textos ASCII solo necesitan lower()
+    text = text.lower() if text.isascii() else fold(text)
+    return [_stem(w) for w in _WORD.findall(text) if w not in STOPWORDS]
+
+
+def _explode(inverse, token_lists):
+    """Pares (término, fila) de una columna categórica: cada fila recibe los términos de su categoría."""
+    sizes = np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+    flat = np.array([t for tokens in token_lists for t in tokens], dtype=np.int64)
+    counts = sizes[inverse]
+    starts = np.repeat((np.cumsum(sizes) - sizes)[inverse], counts)
+    within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = np.repeat(np.arange(len(inverse), dtype=np.int64), counts)
+    return flat[starts + within], rows, counts
+
+
+def _codes(values):
+    """(códigos por fila, valores distintos en orden de aparición) de una lista de textos."""
+    distinct = {}
+    codes = np.fromiter((distinct.setdefault(v, len(distinct)) for v in values), dtype=np.int64, count=len(values))
+    return codes, list(distinct)
+
+
+class BM25Index:
+    """Listas invertidas término -> (filas, peso BM25) en arrays NumPy.
+
+    Cada lista está ordenada por peso descendente: una consulta de un solo
+    término lee directamente sus ``k`` primeras entradas, y una de varios
+    recorre como mucho ``max_postings`` entradas en total, las de más peso de
+    cada término: las listas enormes de los términos frecuentes (cifras
+    pequeñas en tablas de millones de filas) no disparan el peor caso.
+    """
+
+    def __init__(self, terms, rows, lengths, vocabulary, k1=1.2, b=0.75, max_df=0.5, max_postings=MAX_POSTINGS):
+        """Construye las listas a partir de un par (id de término, fila) por aparición.
+
+        ``lengths`` es el número de términos de cada fila y ``vocabulary`` el
+        texto de cada id. Los términos que aparecen en más de ``max_df`` de las
+        filas apenas discriminan y sus listas serían las más largas: no se indexan.
+        """
+        n = len(lengths)
+        self.size = n
+        self.max_postings = max_postings
+        self.postings = {}
+        self.rows = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        if not n or not len(terms):
+            return
+        lengths = np.asarray(lengths, dtype=np.float32)
+        norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()), 1e-9))
+
+        # Una entrada por (término, fila) con su frecuencia, ordenada por término
+        keys, tf = np.unique(np.asarray(terms, dtype=np.int64) * n + rows, return_counts=True)
+        terms, rows = keys // n, (keys % n).astype(np.int32)
+        df = np.bincount(terms, minlength=len(vocabulary))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        tf = tf.astype(np.float32)
+        weights = (idf[terms] * tf * (k1 + 1) / (tf + norm[rows])).astype(np.float32)
+        # Dentro de cada término, por peso descendente (a igual peso, la fila anterior primero)
+        order = np.lexsort((rows, -weights, terms))
+
+        # Las listas son tramos [inicio, fin) de dos arrays compartidos (sin un array por término)
+        self.rows, self.weights = rows[order], weights[order]
+        limit = max_df * n if n > 1 else n
+        end = 0
+        for text, count in zip(vocabulary, df.tolist()):
+            start, end = end, end + count
+            if 0 < count <= limit:
+                self.postings[text] = (start, end)
+
+    @classmethod
+    def from_medal_index(cls, index, **kwargs):
+        """Índice sobre las filas de un ``MedalIndex``.
+
+        Cada fila tiene los términos de su documento (``MedalIndex.document``:
+        país, edición y cifras de medallas) más el total, la posición y el
+        código COI y los alias del país. Los nombres y ediciones se tokenizan una
+        vez por valor distinto y las cifras se indexan vectorizadas: no se
+        tokeniza ningún texto fila a fila.
+        """
+        n = len(index)
+        vocabulary = {}
+
+        def term_ids(tokens):
+            return [vocabulary.setdefault(t, len(vocabulary)) for t in tokens]
+
+        parts = []
+        # Nombre del país, código COI y alias
+        codes, nations = _codes(index.nations)
+        token_lists = []
+        for nation in nations:
+            code, aliases = NATION_ALIASES.get(nation, (None, []))
+            token_lists.append(term_ids(tokenize(" ".join([nation, code or "", *aliases]))))
+        parts.append(_explode(codes, token_lists))
+        # Edición ("2024 Summer")
+        if index.editions is not None:
+            codes, editions = _codes(index.editions)
+            parts.append(_explode(codes, [term_ids(tokenize(e)) for e in editions]))
+        # Cifras: oros, platas, bronces, total y posición (sin las filas con Rank -1)
+        columns = [index.counts[m] for m in ("Gold", "Silver", "Bronze", "Total")] + [index.ranks]
+        numbers = np.concatenate([np.asarray(c, dtype=np.int64) for c in columns])
+        number_rows = np.tile(np.arange(n, dtype=np.int64), len(columns))
+        keep = numbers >= 0
+        numbers, number_rows = numbers[keep], number_rows[keep]
+        distinct, inverse = np.unique(numbers, return_inverse=True)
+        number_terms = np.array(term_ids(str(v) for v in distinct.tolist()), dtype=np.int64)[inverse]
+        parts.append((number_terms, number_rows, np.bincount(number_rows, minlength=n)))
+
+        terms = np.concatenate([p[0] for p in parts])
+        rows = np.concatenate([p[1] for p in parts])
+        # Las palabras fijas del documento ("ganó", "oros", "total"...) están en todas
+        # las filas y no se indexarían, pero cuentan en la longitud
+        lengths = sum(p[2] for p in parts) + len(FIXED_WORDS)
+        return cls(terms, rows, lengths, list(vocabulary), **kwargs)
+
+    def search(self, query, k=5):
+        """(filas, puntuaciones) de las ``k`` filas con mayor BM25 para ``query``, de mayor a menor."""
+        spans = [self.postings[t] for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if not spans:
+            return [], []
+        if len(spans) == 1:
+            (start, end), = spans
+            end = min(end, start + k)
+            return self.rows[start:end].tolist(), self.weights[start:end].tolist()
+        cap = max(self.max_postings // len(spans), k)
+        spans = [(start, min(end, start + cap)) for start, end in spans]
+        rows, inverse = np.unique(np.concatenate([self.rows[a:b] for a, b in spans]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([self.weights[a:b] for a, b in spans]))
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        # Orden estable: a igual puntuación, la fila anterior primero
+        top = top[np.lexsort((rows[top], -scores[top]))]
+        return rows[top].tolist(), scores[top].tolist()
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K, limit=None):
+    """Fusiona listas ordenadas de claves: puntuación = Σ 1 / (k + posición).
+
+    No necesita que las puntuaciones de cada lista sean comparables (distancia
+    coseno frente a BM25), solo el orden. A igual puntuación gana la clave que
+    apareció antes.
+    """
+    scores = {}
+    for ranking in rankings:
+        for position, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + position)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit is not None else fused
@@ -0,0 +1,227 @@
+"""Detección de países en consultas con un autómata Aho-Corasick.
+
+El autómata se compila una sola vez sobre los nombres limpios de las naciones,
+sus códigos COI y alias en español/inglés, y recorre la consulta en una sola
+pasada. Las coincidencias respetan límites de palabra y se resuelven por la
+más larga ("Nigeria" gana a "Niger"), de modo que varias naciones en la misma
+consulta salen sin coste adicional.
+"""
+import re
+import unicodedata
+from collections import deque
+
+# Nombre en la tabla de Wikipedia -> (código COI, alias en español/inglés)
+NATION_ALIASES = {
+    "United States": ("USA", ["Estados Unidos", "EEUU", "EE.UU.", "EE. UU.", "USA", "US"]),
+    "China": ("CHN", ["República Popular China"]),
+    "Japan": ("JPN", ["Japón"]),
+    "Australia": ("AUS", []),
+    "France": ("FRA", ["Francia"]),
+    "Netherlands": ("NED", ["Países Bajos", "Holanda"]),
+    "Great Britain": ("GBR", ["Gran Bretaña", "Reino Unido", "United Kingdom", "UK"]),
+    "South Korea": ("KOR", ["Corea del Sur", "Korea"]),
+    "Italy": ("ITA", ["Italia"]),
+    "Germany": ("GER", ["Alemania"]),
+    "New Zealand": ("NZL", ["Nueva Zelanda"]),
+    "Canada": ("CAN", ["Canadá"]),
+    "Uzbekistan": ("UZB", ["Uzbekistán"]),
+    "Hungary": ("HUN", ["Hungría"]),
+    "Spain": ("ESP", ["España"]),
+    "Sweden": ("SWE", ["Suecia"]),
+    "Kenya": ("KEN", ["Kenia"]),
+    "Norway": ("NOR", ["Noruega"]),
+    "Ireland": ("IRL", ["Irlanda"]),
+    "Brazil": ("BRA", ["Brasil"]),
+    "Iran": ("IRI", ["Irán"]),
+    "Ukraine": ("UKR", ["Ucrania"]),
+    "Romania": ("ROU", ["Rumania", "Rumanía"]),
+    "Georgia": ("GEO", []),
+    "Belgium": ("BEL", ["Bélgica"]),
+    "Bulgaria": ("BUL", []),
+    "Serbia": ("SRB", []),
+    "Czech Republic": ("CZE", ["República Checa", "Chequia", "Czechia"]),
+    "Denmark": ("DEN", ["Dinamarca"]),
+    "Azerbaijan": ("AZE", ["Azerbaiyán"]),
+    "Croatia": ("CRO", ["Croacia"]),
+    "Cuba": ("CUB", []),
+    "Bahrain": ("BRN", ["Baréin", "Bahréin"]),
+    "Slovenia": ("SLO", ["Eslovenia"]),
+    "Chinese Taipei": ("TPE", ["Taipéi Chino", "Taiwán", "Taiwan"]),
+    "Austria": ("AUT", []),
+    "Hong Kong": ("HKG", []),
+    "Philippines": ("PHI", ["Filipinas"]),
+    "Algeria": ("ALG", ["Argelia"]),
+    "Indonesia": ("INA", []),
+    "Israel": ("ISR", []),
+    "Poland": ("POL", ["Polonia"]),
+    "Kazakhstan": ("KAZ", ["Kazajistán"]),
+    "Jamaica": ("JAM", []),
+    "South Africa": ("RSA", ["Sudáfrica"]),
+    "Thailand": ("THA", ["Tailandia"]),
+    "Ethiopia": ("ETH", ["Etiopía"]),
+    "Switzerland": ("SUI", ["Suiza"]),
+    "Ecuador": ("ECU", []),
+    "Portugal": ("POR", []),
+    "Greece": ("GRE", ["Grecia"]),
+    "Argentina": ("ARG", []),
+    "Egypt": ("EGY", ["Egipto"]),
+    "Tunisia": ("TUN", ["Túnez"]),
+    "Botswana": ("BOT", []),
+    "Chile": ("CHI", []),
+    "Saint Lucia": ("LCA", ["Santa Lucía"]),
+    "Uganda": ("UGA", []),
+    "Dominican Republic": ("DOM", ["República Dominicana"]),
+    "Guatemala": ("GUA", []),
+    "Morocco": ("MAR", ["Marruecos"]),
+    "Dominica": ("DMA", []),
+    "Pakistan": ("PAK", ["Pakistán"]),
+    "Turkey": ("TUR", ["Turquía", "Türkiye"]),
+    "Mexico": ("MEX", ["México"]),
+    "Armenia": ("ARM", []),
+    "Colombia": ("COL", []),
+    "Kyrgyzstan": ("KGZ", ["Kirguistán"]),
+    "North Korea": ("PRK", ["Corea del Norte"]),
+    "Lithuania": ("LTU", ["Lituania"]),
+    "India": ("IND", []),
+    "Moldova": ("MDA", ["Moldavia"]),
+    "Kosovo": ("KOS", []),
+    "Cyprus": ("CYP", ["Chipre"]),
+    "Fiji": ("FIJ", ["Fiyi"]),
+    "Jordan": ("JOR", ["Jordania"]),
+    "Mongolia": ("MGL", []),
+    "Panama": ("PAN", ["Panamá"]),
+    "Tajikistan": ("TJK", ["Tayikistán"]),
+    "Albania": ("ALB", []),
+    "Grenada": ("GRN", ["Granada"]),
+    "Malaysia": ("MAS", ["Malasia"]),
+    "Puerto Rico": ("PUR", []),
+    "Ivory Coast": ("CIV", ["Costa de Marfil", "Côte d'Ivoire"]),
+    "Cape Verde": ("CPV", ["Cabo Verde"]),
+    "Peru": ("PER", ["Perú"]),
+    "Qatar": ("QAT", ["Catar"]),
+    "Refugee Olympic Team": ("EOR", ["Equipo Olímpico de Refugiados"]),
+    "Singapore": ("SGP", ["Singapur"]),
+    "Slovakia": ("SVK", ["Eslovaquia"]),
+    "Zambia": ("ZAM", []),
+    "Russia": ("RUS", ["Rusia"]),
+    "Venezuela": ("VEN", []),
+    "Nigeria": ("NGR", []),
+    "Niger": ("NIG", ["Níger"]),
+    "Uruguay": ("URU", []),
+    "Paraguay": ("PAR", []),
+    "Bolivia": ("BOL", []),
+    "Costa Rica": ("CRC", []),
+    "Finland": ("FIN", ["Finlandia"]),
+    "Estonia": ("EST", []),
+    "Latvia": ("LAT", ["Letonia"]),
+    "Belarus": ("BLR", ["Bielorrusia"]),
+    "Vietnam": ("VIE", []),
+    "Saudi Arabia": ("KSA", ["Arabia Saudita", "Arabia Saudí"]),
+}
+
+_CODE_SUFFIX = re.compile(r"^(?P<name>.*?)\s*\((?P<code>[A-Z]{3})\)$")
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin acentos, conservando la longitud carácter a carácter."""
+    return "".join(unicodedata.normalize("NFKD", c)[0].lower() for c in text)
+
+
+class CountryMatcher:
+    """Autómata Aho-Corasick sobre nombres, códigos y alias de países."""
+
+    def __init__(self, patterns):
+        """``patterns``: iterable de (texto, fila, solo_mayúsculas).
+
+        Los códigos COI se buscan solo en mayúsculas ("POR", "CAN" son palabras
+        comunes en minúsculas).
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for text, row, upper_only in patterns:
+            key = fold(text.strip())
+            if key:
+                self._add(key, row, upper_only)
+        self._build()
+
+    @classmethod
+    def from_nations(cls, nations):
+        """Construye el autómata para una lista de nombres tal como aparecen en la tabla."""
+        patterns = []
+        for row, nation in enumerate(nations):
+            name, code = nation, None
+            m = _CODE_SUFFIX.match(nation)
+            if m:
+                name, code = m.group("name"), m.group("code")
+            patterns.append((nation, row, False))
+            patterns.append((name, row, False))
+            known_code, aliases = NATION_ALIASES.get(name, (None, []))
+            code = code or known_code
+            if code:
+                patterns.append((code, row, True))
+            # Siglas cortas ("US", "UK") solo en mayúsculas para no chocar con palabras comunes
+            patterns.extend((alias, row, alias.isupper() and len(alias) <= 3) for alias in aliases)
+        return cls(patterns)
+
+    def _add(self, key, row, upper_only):
+        state = 0
+        for c in key:
+            nxt = self._goto[state].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        entry = (len(key), row, upper_only)
+        if entry not in self._out[state]:
+            self._out[state].append(entry)
+
+    def _build(self):
+        # Recorrido en anchura: los hijos de la raíz fallan a la raíz
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(c, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Índices de fila de los países mencionados en ``text``, en orden de aparición.
+
+        Una sola pasada sobre el texto; entre coincidencias solapadas gana la
+        más larga y solo se aceptan palabras completas.
+        """
+        folded = fold(text)
+        n = len(folded)
+        candidates = []
+        state = 0
+        for end, c in enumerate(folded, 1):
+            while state and c not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(c, 0)
+            for length, row, upper_only in self._out[state]:
+                start = end - length
+                if start > 0 and folded[start - 1].isalnum():
+                    continue
+                if end < n and folded[end].isalnum():
+                    continue
+                if upper_only and not text[start:end].isupper():
+                    continue
+                candidates.append((start, -length, row))
+
+        rows = []
+        covered_until = 0
+        for start, neg_length, row in sorted(candidates):
+            if start < covered_until:
+                continue
+            covered_until = start - neg_length
+            if row not in rows:
+                rows.append(row)
+        return rows
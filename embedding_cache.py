@@ -0,0 +1,90 @@
+"""Caché LRU de embeddings de consultas.
+
+Las preguntas repetidas (o que solo difieren en mayúsculas, espacios o signos
+de interrogación) reutilizan el vector ya calculado en lugar de pasar otra vez
+por el SentenceTransformer. La caché está acotada por número de entradas y por
+bytes, y lleva contadores de aciertos/fallos.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Clave de caché: minúsculas, sin acentos, espacios colapsados y sin signos ¿?¡! en los extremos."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ¿?¡!.")
+
+
+class QueryEmbeddingCache:
+    """LRU de embeddings por texto de consulta normalizado, segura entre hilos."""
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _put(self, key, vector):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def get_many(self, queries, encode):
+        """Embeddings de ``queries`` en orden; los fallos se codifican con una sola llamada a ``encode``.
+
+        ``encode`` recibe una lista de textos normalizados y devuelve sus vectores
+        (por ejemplo, la función de embeddings de Chroma).
+        """
+        keys = [normalize_query(q) for q in queries]
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            n_missed = sum(1 for k in keys if k not in found)
+            self.hits += len(keys) - n_missed
+            self.misses += n_missed
+
+        if missing:
+            vectors = [np.asarray(v, dtype=np.float32) for v in encode(missing)]
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._put(key, vector)
+        return [found[k] for k in keys]
+
+    def stats(self):
+        """Contadores de aciertos/fallos y ocupación actual."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,75 @@
+"""Worker dedicado de embeddings con micro-batching.
+
+Con varias peticiones concurrentes, cada hilo llamaba al SentenceTransformer por
+separado y competían por el mismo modelo. ``EmbeddingBatcher`` se usa como una
+función de embeddings normal (lista de textos -> lista de vectores), pero
+encola las peticiones y un único hilo las agrupa: todo lo que llega dentro de
+``max_wait`` segundos (hasta ``max_batch`` textos) se codifica en un solo
+forward del modelo.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class EmbeddingBatcher:
+    """Agrupa llamadas concurrentes a ``encode`` en lotes procesados por un hilo dedicado."""
+
+    def __init__(self, encode, max_batch=64, max_wait=0.005):
+        self._encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-worker", daemon=True)
+        self._thread.start()
+
+    def __call__(self, input):
+        texts = list(input)
+        future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _collect(self):
+        """Primera petición en espera más todas las que lleguen dentro de la ventana."""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [t for item_texts, _ in batch for t in item_texts]
+            try:
+                vectors = list(self._encode(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(texts)
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    def stats(self):
+        """Número de lotes, textos codificados y tamaño medio de lote."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,122 @@
+"""Backend de embeddings configurable, con carga perezosa y compartido por el proceso.
+
+- ``EMBEDDING_MODEL``: modelo de sentence-transformers (all-MiniLM-L6-v2 por defecto).
+- ``EMBEDDING_BACKEND``: ``torch`` (PyTorch), ``onnx`` (ONNX Runtime en CPU) u
+  ``onnx-int8`` (modelo ONNX cuantizado a int8, fichero ``EMBEDDING_ONNX_FILE``).
+  Los backends ONNX necesitan ``pip install sentence-transformers[onnx]``.
+- ``EMBEDDING_THREADS``: hilos de inferencia (0 = lo que decida la librería).
+
+Crear la función de embeddings no carga nada: el modelo se carga en la primera
+llamada (el primer documento a embeber o la primera consulta vectorial), así el
+arranque en caliente y las consultas estructuradas no pagan PyTorch/ONNX. Hay un
+único modelo por configuración en todo el proceso.
+"""
+import logging
+import os
+import threading
+
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+from telemetry import span
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+# Variante cuantizada incluida en el repositorio del modelo en Hugging Face
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def model_kwargs(backend=EMBEDDING_BACKEND, onnx_file=EMBEDDING_ONNX_FILE):
+    """Argumentos de ``SentenceTransformer`` para un backend (solo tipos primitivos, se guardan en Chroma)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"EMBEDDING_BACKEND debe ser uno de {BACKENDS}")
+    if backend == "torch":
+        return {}
+    if backend == "onnx":
+        return {"backend": "onnx"}
+    return {"backend": "onnx", "model_kwargs": {"file_name": onnx_file}}
+
+
+def embedding_id(model_name=EMBEDDING_MODEL, backend=EMBEDDING_BACKEND, onnx_file=EMBEDDING_ONNX_FILE):
+    """Identificador de los vectores que produce una configuración (va en la huella del almacén).
+
+    PyTorch y ONNX sin cuantizar dan los mismos vectores; el modelo int8 no.
+    """
+    return f"{model_name}:{onnx_file}" if backend == "onnx-int8" else model_name
+
+
+def _load_model(model_name, device, kwargs, threads):
+    """Carga el ``SentenceTransformer`` con el número de hilos indicado."""
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = dict(kwargs)
+    if threads:
+        if kwargs.get("backend") == "onnx":
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            kwargs["model_kwargs"] = {**kwargs.get("model_kwargs", {}), "session_options": options}
+        else:
+            import torch
+
+            torch.set_num_threads(threads)
+    return SentenceTransformer(model_name_or_path=model_name, device=device, **kwargs)
+
+
+class LazyEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+    """``SentenceTransformerEmbeddingFunction`` que no carga el modelo hasta la primera llamada.
+
+    Conserva el nombre y la configuración de la función de Chroma, así las
+    colecciones ya persistidas se siguen abriendo igual.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, device="cpu", normalize_embeddings=False,
+                 threads=EMBEDDING_THREADS, **kwargs):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = kwargs
+        self.threads = threads
+
+    def _key(self):
+        return (self.model_name, self.device, repr(sorted(self.kwargs.items())), self.threads)
+
+    @property
+    def _model(self):
+        key = self._key()
+        model = _models.get(key)
+        if model is None:
+            with _models_lock:
+                model = _models.get(key)
+                if model is None:
+                    logger.info("🧩 Cargando modelo de embeddings %s (%s)...", self.model_name, self.kwargs.get("backend", "torch"))
+                    with span("embed.load_model"):
+                        model = _models[key] = _load_model(self.model_name, self.device, self.kwargs, self.threads)
+        return model
+
+    def __call__(self, input):
+        with span("embed", items=len(input), nbytes=sum(len(t.encode("utf-8")) for t in input)):
+            return super().__call__(input)
+
+    @property
+    def loaded(self):
+        """True si el modelo ya está cargado en este proceso."""
+        return self._key() in _models
+
+
+_embedding_fn = None
+
+
+def get_embedding_function():
+    """Función de embeddings compartida por la colección y la caché de consultas (una por proceso)."""
+    global _embedding_fn
+    if _embedding_fn is None:
+        _embedding_fn = LazyEmbeddingFunction(**model_kwargs())
+    return _embedding_fn
@@ -1,31 +1,126 @@
+import asyncio
+import logging
 import os
+import threading
 import gradio as gr
-from vector_db import create_vector_db, query_vector_db
-from scraper import scrape_medal_table
-from rag import run_rag
-from agent import answer_with_agent
+from vector_db import create_vector_db, load_medal_index, load_vector_db, query_vector_db
+from embeddings import get_embedding_function
+from scraper import HTTP_HEADERS, MEDAL_TABLE_URL, scrape_medal_table
+from page_cache import PageCache
+from rag import run_rag, set_query_encoder
+from agent_async import astream_answer
+from embedding_worker import EmbeddingBatcher
+from medal_index import MedalIndex
+from numpy_retriever import NumpyRetriever
+from refresh import needs_reindex, page_digest, start_polling
+from telemetry import METRICS_PORT, configure_logging, start_metrics_server
 import os
 
+logger = logging.getLogger(__name__)
 
-def setup():
-    df = scrape_medal_table()
-    collection, df_clean = create_vector_db(df)
+# Peticiones que la cola de Gradio procesa a la vez
+GRADIO_CONCURRENCY = int(os.getenv("GRADIO_CONCURRENCY", "16"))
+# Backend de recuperación: "chroma" o "numpy" (matriz cuantizada en memoria, int8 por defecto)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")
+RETRIEVER_DTYPE = os.getenv("RETRIEVER_DTYPE", "int8")
+# Segundos entre revalidaciones de la tabla de medallas (0 = sin refresco periódico)
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "0"))
+
+
+def setup(refresh=False):
+    # Arranque en caliente: reutilizar el almacén persistido si existe.
+    # Con refresh=True se revalida la página (petición condicional); si no cambió
+    # no se parsea ni se embebe nada, y si cambió solo se re-embebe lo modificado.
+    warm = load_vector_db()
+    if warm is not None and not refresh:
+        return warm
+    page = PageCache(headers=HTTP_HEADERS).get(MEDAL_TABLE_URL)
+    # La huella del manifiesto (no page.changed) dice si esta versión ya está indexada:
+    # un cambio cuya ingesta falló sigue pendiente aunque la caché ya tenga la página
+    if warm is not None and not needs_reindex(page):
+        return warm
+    df = scrape_medal_table(html=page.body)
+    try:
+        collection, df_clean = create_vector_db(df, source=page_digest(page))
+    except ValueError as e:
+        # Tabla mal formada: seguir sirviendo los datos anteriores si los hay
+        if warm is None:
+            raise
+        logger.warning("⚠️ Tabla descargada rechazada, se mantienen los datos anteriores: %s", e)
+        return warm
     return collection, df_clean
 
 
-collection, df_clean = setup()
+class ServingState:
+    """Estado compartido de solo lectura entre peticiones; se rellena en segundo plano."""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.error = None
+        self.collection = None
+        self.df_clean = None
+        self.medal_index = None
+
+
+state = ServingState()
+
+
+def publish(collection, df_clean):
+    """Sustituye colección, DataFrame e índice del estado (las peticiones en curso siguen con los anteriores)."""
+    if RETRIEVER_BACKEND == "numpy":
+        collection = NumpyRetriever.from_collection(collection, dtype=RETRIEVER_DTYPE)
+    # Índice de ranking precalculado una sola vez para todas las consultas,
+    # sobre el snapshot memory-mapped si existe
+    medal_index = load_medal_index() or MedalIndex.from_df(df_clean)
+    # El índice BM25 (búsqueda híbrida en rag.run_rag) se construye antes de publicar
+    medal_index.lexical
+    state.collection, state.df_clean, state.medal_index = collection, df_clean, medal_index
+
+
+def load_state(refresh=False):
+    """Carga colección, DataFrame e índice y marca el estado como listo."""
+    try:
+        publish(*setup(refresh))
+        # Un único hilo codifica las consultas, agrupando las que llegan a la vez
+        set_query_encoder(EmbeddingBatcher(get_embedding_function()))
+        state.ready.set()
+        if REFRESH_INTERVAL > 0:
+            # Solo se aplican los cambios de la tabla (ver vector_db.create_vector_db)
+            start_polling(REFRESH_INTERVAL, publish)
+    except Exception as e:
+        state.error = e
+        logger.error("⚠️ Error cargando el índice: %s", e)
+
+
+def start_background_setup(refresh=False):
+    """Carga el índice en un hilo para que la interfaz arranque sin esperar."""
+    thread = threading.Thread(target=load_state, args=(refresh,), name="index-loader", daemon=True)
+    thread.start()
+    return thread
+
+
+def _history_text(history):
+    return "\n\n".join([f"{h['tool']}({h['param']}): {h['result']}" for h in history])
+
 
+async def answer(query: str):
+    if not state.ready.is_set():
+        if state.error is not None:
+            yield f"⚠️ No se pudo cargar el índice: {state.error}", ""
+        else:
+            yield "⏳ Cargando el índice de medallas, inténtalo en unos segundos...", ""
+        return
 
-def answer(query: str):
     # If GOOGLE_API_KEY is present, use the Gemini agent which may call tools.
+    # The async agent streams tokens into the textbox as they arrive.
     if os.getenv("GOOGLE_API_KEY"):
-        final, history = answer_with_agent(query, collection, df_clean)
-        hist_text = "\n\n".join([f"{h['tool']}({h['param']}): {h['result']}" for h in history])
-        return final, hist_text
+        async for final, history in astream_answer(query, state.collection, state.df_clean, index=state.medal_index):
+            yield final, _history_text(history)
+        return
 
     # fallback: only run RAG
-    rag_answer = run_rag(query, collection, df_clean)
-    return rag_answer, "(No GOOGLE_API_KEY set; tools no disponibles)"
+    rag_answer = await asyncio.to_thread(run_rag, query, state.collection, state.df_clean, state.medal_index)
+    yield rag_answer, "(No GOOGLE_API_KEY set; tools no disponibles)"
 
 
 with gr.Blocks() as demo:
@@ -35,11 +130,16 @@ with gr.Blocks() as demo:
     out_rag = gr.Textbox(label="RAG respuesta", lines=12)
     out_tool = gr.Textbox(label="Tool output")
     btn = gr.Button("Enviar")
-    btn.click(answer, inputs=[query_in], outputs=[out_rag, out_tool])
+    btn.click(answer, inputs=[query_in], outputs=[out_rag, out_tool], api_name="answer")
 
 
 def main():
-    demo.launch()
+    configure_logging()
+    if METRICS_PORT:
+        # Métricas de las etapas del pipeline en formato Prometheus
+        start_metrics_server(METRICS_PORT)
+    start_background_setup()
+    demo.queue(default_concurrency_limit=GRADIO_CONCURRENCY).launch()
 
 
 if __name__ == "__main__":
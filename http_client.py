@@ -0,0 +1,147 @@
+"""Cliente HTTP compartido para Gemini y las tools.
+
+Una ``requests.Session`` con pool de conexiones keep-alive, límite de peticiones
+simultáneas por host, reintentos con backoff exponencial con jitter (respetando
+``Retry-After`` en 429/503) e histogramas de latencia por endpoint.
+"""
+import email.utils
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Límites superiores (segundos) de los buckets de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LatencyHistogram:
+    """Histograma acumulado de latencias con buckets fijos."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.sum += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self):
+        """Copia de los contadores: buckets (acumulados), número de observaciones y suma."""
+        with self._lock:
+            cumulative, running = [], 0
+            for bound, n in zip(self.buckets, self.counts):
+                running += n
+                cumulative.append((bound, running))
+            return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+class HttpClient:
+    """Sesión HTTP con keep-alive, concurrencia acotada por host, reintentos y métricas."""
+
+    def __init__(self, pool_size=16, max_per_host=4, max_retries=3, backoff_base=0.5, backoff_max=20.0,
+                 retry_statuses=RETRY_STATUSES):
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.histograms = defaultdict(LatencyHistogram)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slots(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def _backoff(self, attempt):
+        """Backoff exponencial con jitter completo."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, response):
+        """Segundos indicados por ``Retry-After`` (entero o fecha HTTP), acotados a ``backoff_max``."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0.0), self.backoff_max)
+
+    def request(self, method, url, endpoint=None, retry_on_exceptions=True, **kwargs):
+        """Como ``requests.request`` pero con pool, límite por host, reintentos y métricas.
+
+        ``endpoint`` es la etiqueta del histograma (por defecto, host + ruta).
+        Con ``retry_on_exceptions=False`` solo se reintentan las respuestas de
+        ``retry_statuses`` (el servidor no procesó la petición) y un timeout o
+        error de conexión se relanza al primer intento: para POST lentos o no
+        idempotentes. Tras agotar los reintentos devuelve la última respuesta (o
+        relanza el último error de conexión) para que el llamador decida.
+        """
+        parts = urlsplit(url)
+        endpoint = endpoint or f"{parts.netloc}{parts.path}"
+        max_retries = self.max_retries
+        for attempt in range(max_retries + 1):
+            start = time.perf_counter()
+            try:
+                with self._slots(parts.netloc):
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.histograms[endpoint].observe(time.perf_counter() - start)
+                if attempt == max_retries or not retry_on_exceptions:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            self.histograms[endpoint].observe(time.perf_counter() - start)
+
+            if response.status_code not in self.retry_statuses or attempt == max_retries:
+                return response
+            wait = self._retry_after(response)
+            response.close()
+            time.sleep(self._backoff(attempt) if wait is None else wait)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def latency_report(self):
+        """{endpoint: snapshot del histograma} para todos los endpoints usados."""
+        return {endpoint: h.snapshot() for endpoint, h in list(self.histograms.items())}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Cliente compartido por todo el proceso."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -1,34 +1,155 @@
-from scraper import scrape_medal_table
-from vector_db import create_vector_db, query_vector_db
-from rag import run_rag
-import os
-from agent import answer_with_agent, call_gemini_http
+"""CLI del proyecto: scrape, index, ask, serve y bench.
 
-import gradio_app as gr
+Cada subcomando importa solo lo que necesita y no se hace trabajo al importar:
+``ask`` sobre un índice ya construido responde las preguntas estructuradas
+desde el snapshot Arrow sin cargar chromadb, pandas, el modelo de embeddings,
+Gradio ni Playwright (ver ``benchmarks/bench_cli_startup.py``).
 
-def main():
-    print("==========================================")
-    print("🏅 PROYECTO SCRAPING OLÍMPICO + RAG")
-    print("==========================================\n")
+  python main.py scrape [--out medallas.csv]
+  python main.py index [--refresh]
+  python main.py ask "¿Qué país ganó más oros?" [--agent]
+  python main.py serve                  # también sin subcomando
+  python main.py bench [--quick ...]    # benchmarks/run.py
+"""
+import argparse
+import logging
+import sys
 
-    print("🕸️ Scrapeando datos de Wikipedia...")
-    df = scrape_medal_table()
-    print(df.head())
+logger = logging.getLogger(__name__)
 
-    print("\n💾 Creando base de datos vectorial...")
-    collection, df_clean = create_vector_db(df)
 
-    print("\n🔍 Consultas de ejemplo:")
-    query_vector_db(collection, "¿Qué país ganó más medallas de oro?", df_clean)
-    query_vector_db(collection, "¿Qué nación obtuvo más medallas totales?", df_clean)
+def cmd_scrape(args):
+    from page_cache import PageCache
+    from scraper import HTTP_HEADERS, MEDAL_TABLE_URL, scrape_medal_table
 
-    pregunta = "¿Qué país ganó más oros?"
-    rag_result = run_rag(pregunta, collection, df_clean)
+    logger.info("🕸️ Scrapeando datos de Wikipedia...")
+    cache = None if args.no_cache else PageCache(headers=HTTP_HEADERS)
+    df = scrape_medal_table(args.url or MEDAL_TABLE_URL, cache=cache)
+    if args.out:
+        df.to_csv(args.out, index=False)
+        logger.info("💾 %d filas guardadas en %s", len(df), args.out)
+    else:
+        print(df.to_string(index=False))
+    return 0
 
-    #inciar gradio
 
-    print("Iniciando interfaz Gradio...")
-    gr.main()
+def cmd_index(args):
+    from vector_db import create_vector_db, load_vector_db
+
+    if not args.refresh and load_vector_db() is not None:
+        logger.info("✅ El índice ya existe; usa --refresh para revalidar la página.")
+        return 0
+
+    from page_cache import PageCache
+    from refresh import needs_reindex, page_digest
+    from scraper import HTTP_HEADERS, MEDAL_TABLE_URL, scrape_medal_table
+
+    url = args.url or MEDAL_TABLE_URL
+    logger.info("🕸️ Revalidando la página de Wikipedia...")
+    # ttl=0: siempre petición condicional al servidor (304 si no cambió)
+    page = PageCache(ttl=0, headers=HTTP_HEADERS).get(url)
+    # Como gradio_app.setup: sin parseo ni ingesta si esta versión de la página ya está indexada
+    if not page.changed and not needs_reindex(page):
+        logger.info("✅ La página no cambió (%s); el índice está al día.", page.status)
+        return 0
+    df = scrape_medal_table(url, html=page.body)
+    logger.info("💾 Creando base de datos vectorial...")
+    create_vector_db(df, source=page_digest(page))
+    return 0
+
+
+def cmd_ask(args):
+    from query_planner import plan_query
+    from rag import run_rag
+    from vector_db import load_medal_index
+
+    query = " ".join(args.question)
+    index = load_medal_index()
+    if index is None:
+        logger.error("⚠️ No hay índice construido; ejecuta antes `python main.py index`.")
+        return 1
+
+    # La colección (chromadb + modelo) solo se abre si la pregunta necesita búsqueda semántica
+    collection = df = None
+    if args.agent or plan_query(query, index).intent == "search":
+        from vector_db import load_vector_db
+
+        warm = load_vector_db()
+        if warm is None:
+            logger.error("⚠️ El almacén vectorial no coincide con el modelo actual; ejecuta `python main.py index`.")
+            return 1
+        collection, df = warm
+
+    if args.agent:
+        from agent import answer_with_agent
+
+        answer, history = answer_with_agent(query, collection, df, index=index)
+        for h in history:
+            logger.info("🔧 %s(%s): %s", h["tool"], h["param"], h["result"])
+    else:
+        answer = run_rag(query, collection, df, index=index)
+    print(answer)
+    return 0
+
+
+def cmd_serve(args):
+    import gradio_app
+
+    logger.info("Iniciando interfaz Gradio...")
+    gradio_app.main()
+    return 0
+
+
+def cmd_bench(args):
+    from benchmarks.run import main as run_benchmarks
+
+    return run_benchmarks(args.bench_args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="🏅 Scraping olímpico + RAG")
+    parser.add_argument("--log-level", default=None, help="nivel de logging (por defecto LOG_LEVEL o INFO)")
+    parser.set_defaults(func=cmd_serve)
+    sub = parser.add_subparsers(title="subcomandos")
+
+    p = sub.add_parser("scrape", help="descarga y muestra (o guarda) la tabla de medallas")
+    p.add_argument("--url", help="página de la tabla (por defecto, Juegos de 2024)")
+    p.add_argument("--out", help="fichero CSV de salida")
+    p.add_argument("--no-cache", action="store_true", help="no usar la caché de páginas")
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser("index", help="construye o actualiza el índice vectorial")
+    p.add_argument("--url", help="página de la tabla (por defecto, Juegos de 2024)")
+    p.add_argument("--refresh", action="store_true", help="revalida la página aunque ya haya índice")
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser("ask", help="responde una pregunta con el índice ya construido")
+    p.add_argument("question", nargs="+")
+    p.add_argument("--agent", action="store_true", help="usa el agente Gemini con tools (requiere GOOGLE_API_KEY)")
+    p.set_defaults(func=cmd_ask)
+
+    p = sub.add_parser("serve", help="lanza la interfaz Gradio")
+    p.set_defaults(func=cmd_serve)
+
+    # El resto de argumentos pasa tal cual a benchmarks/run.py (ver main)
+    p = sub.add_parser("bench", help="suite de benchmarks (argumentos de benchmarks/run.py)", add_help=False)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.func is cmd_bench:
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"argumentos no reconocidos: {' '.join(extra)}")
+
+    from telemetry import LOG_LEVEL, configure_logging
+
+    configure_logging(args.log_level or LOG_LEVEL)
+    return args.func(args)
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Índice precalculado del ranking de medallas.
+
+Se construye una sola vez a partir del DataFrame limpio y guarda las columnas de
+medallas como arrays NumPy compactos junto con el orden (argsort) de cada tipo
+de medalla, de forma que el top-k y la búsqueda por país no tocan pandas.
+"""
+import hashlib
+import re
+from functools import cached_property
+
+import numpy as np
+
+from bm25 import BM25Index
+from country_matcher import CountryMatcher
+from snapshot import clean_medal_df
+
+MEDALS = ("Gold", "Silver", "Bronze", "Total")
+MEDAL_NAMES = {"Gold": "oros", "Silver": "platas", "Bronze": "bronces", "Total": "medallas totales"}
+
+
+def clean_country_name(name):
+    """Limpia símbolos como ‡, *, †."""
+    return re.sub(r"[‡*†]", "", str(name)).strip()
+
+
+def _int_array(values):
+    """Array de enteros sin copiar si ya lo es (p. ej. int16 del snapshot memory-mapped)."""
+    values = np.asarray(values)
+    return values if values.dtype.kind == "i" else values.astype(np.int32)
+
+
+def _view(array):
+    """Vista NumPy sin copia de un array Arrow de enteros sin nulos.
+
+    Como ``to_numpy(zero_copy_only=True)``, pero leyendo el buffer directamente:
+    ``to_numpy`` importa pandas (~0,2 s) y ``main.py ask`` no lo necesita.
+    """
+    if array.null_count:
+        raise ValueError("La columna del snapshot tiene valores nulos")
+    dtype = np.dtype(array.type.to_pandas_dtype())
+    return np.frombuffer(array.buffers()[1], dtype=dtype, count=len(array), offset=array.offset * dtype.itemsize)
+
+
+def _decode(column):
+    """Lista de textos de una columna Arrow (los diccionarios comparten cada cadena distinta)."""
+    column = column.combine_chunks() if hasattr(column, "combine_chunks") else column
+    if hasattr(column, "dictionary"):
+        words = np.array(column.dictionary.to_pylist(), dtype=object)
+        return words[_view(column.indices)].tolist()
+    return column.to_pylist()
+
+
+class MedalIndex:
+    """Columnas de medallas en NumPy con órdenes y posiciones precalculados."""
+
+    def __init__(self, nations, ranks, gold, silver, bronze, editions=None):
+        # Una limpieza por nombre distinto (en tablas de muchas ediciones los nombres se repiten)
+        nations = list(nations)
+        cleaned = {n: clean_country_name(n) for n in dict.fromkeys(nations)}
+        dirty = any(k != v for k, v in cleaned.items())
+        self.nations = [cleaned[n] for n in nations] if dirty else nations
+        # Edición de cada fila (tabla combinada de varias ediciones) o None
+        self.editions = [str(e) for e in editions] if editions is not None else None
+        self.ranks = _int_array(ranks)
+        gold = _int_array(gold)
+        silver = _int_array(silver)
+        bronze = _int_array(bronze)
+        self.counts = {
+            "Gold": gold,
+            "Silver": silver,
+            "Bronze": bronze,
+            "Total": gold.astype(np.int32) + silver + bronze,
+        }
+        # Orden descendente estable por tipo de medalla y su inversa (posición en el ranking)
+        self.orders = {m: np.argsort(-self.counts[m], kind="stable") for m in MEDALS}
+        self.positions = {}
+        for m, order in self.orders.items():
+            pos = np.empty(len(order), dtype=np.int32)
+            pos[order] = np.arange(len(order), dtype=np.int32)
+            self.positions[m] = pos
+        self._edition_indexes = {}
+
+    @classmethod
+    def from_df(cls, df):
+        """Limpia el DataFrame (``snapshot.clean_medal_df``) y construye el índice."""
+        df = clean_medal_df(df)
+        return cls(
+            df["Nation"].tolist(),
+            df["Rank"].to_numpy(),
+            df["Gold"].to_numpy(),
+            df["Silver"].to_numpy(),
+            df["Bronze"].to_numpy(),
+            editions=df["Edition"].tolist() if "Edition" in df.columns else None,
+        )
+
+    @classmethod
+    def from_table(cls, table):
+        """Índice sobre una tabla Arrow del snapshot (``snapshot.read_snapshot``).
+
+        Las columnas int16 memory-mapped se usan sin copiarse; solo se decodifican
+        los nombres (y ediciones) del diccionario.
+        """
+        def column(name):
+            return _view(table.column(name).combine_chunks())
+
+        return cls(
+            _decode(table.column("Nation")),
+            column("Rank"),
+            column("Gold"),
+            column("Silver"),
+            column("Bronze"),
+            editions=_decode(table.column("Edition")) if "Edition" in table.column_names else None,
+        )
+
+    def subset(self, rows):
+        """Nuevo índice con solo las filas ``rows`` (en ese orden)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return MedalIndex(
+            [self.nations[i] for i in rows],
+            self.ranks[rows],
+            self.counts["Gold"][rows],
+            self.counts["Silver"][rows],
+            self.counts["Bronze"][rows],
+            editions=[self.editions[i] for i in rows] if self.editions is not None else None,
+        )
+
+    def for_edition(self, edition):
+        """Índice restringido a una edición ("2024 Summer"); se construye una vez por edición."""
+        if edition not in self._edition_indexes:
+            rows = [i for i, e in enumerate(self.editions or []) if e == edition]
+            self._edition_indexes[edition] = self.subset(rows)
+        return self._edition_indexes[edition]
+
+    @cached_property
+    def matcher(self):
+        """Autómata de detección de países sobre los nombres del índice (se compila una vez)."""
+        return CountryMatcher.from_nations(self.nations)
+
+    @cached_property
+    def _by_name(self):
+        """Nombre en minúsculas -> primera fila con ese nombre (se construye en la primera búsqueda)."""
+        return {n.lower(): i for i, n in reversed(list(enumerate(self.nations)))}
+
+    @cached_property
+    def _by_name_edition(self):
+        """(nombre en minúsculas, edición) -> fila, para las tablas de varias ediciones."""
+        return {(n.lower(), e): i for i, (n, e) in enumerate(zip(self.nations, self.editions or []))}
+
+    @cached_property
+    def lexical(self):
+        """Índice BM25 sobre los documentos, alias y cifras de cada fila (se construye en la primera búsqueda)."""
+        return BM25Index.from_medal_index(self)
+
+    @cached_property
+    def fingerprint(self):
+        """Huella (sha256) de los datos indexados; cambia si cambia cualquier cifra o nombre."""
+        digest = hashlib.sha256("\x1f".join(self.nations).encode("utf-8"))
+        # Siempre en int32: la huella no depende de si el índice viene del snapshot (int16) o de pandas
+        for m in ("Gold", "Silver", "Bronze"):
+            digest.update(self.counts[m].astype(np.int32).tobytes())
+        digest.update(self.ranks.astype(np.int32).tobytes())
+        if self.editions is not None:
+            digest.update("\x1f".join(self.editions).encode("utf-8"))
+        return digest.hexdigest()
+
+    def __len__(self):
+        return len(self.nations)
+
+    def top(self, medal="Total", k=5):
+        """Índices de fila de los ``k`` primeros países según ``medal``. O(k)."""
+        return self.orders[medal][:k]
+
+    def find(self, nation, edition=None):
+        """Índice de fila de un país por nombre (sin mayúsculas/símbolos), o None. O(1).
+
+        Con ``edition`` (tablas de varias ediciones) se busca la fila de esa edición.
+        """
+        name = clean_country_name(nation).lower()
+        if edition is not None and self.editions is not None:
+            return self._by_name_edition.get((name, str(edition)))
+        return self._by_name.get(name)
+
+    def position(self, i, medal="Total"):
+        """Posición (1-based) de la fila ``i`` en el ranking de ``medal``. O(1)."""
+        return int(self.positions[medal][i]) + 1
+
+    def medals(self, i):
+        """Tupla (oros, platas, bronces, total) de la fila ``i``."""
+        return tuple(int(self.counts[m][i]) for m in MEDALS)
+
+    def document(self, i):
+        """Texto descriptivo de la fila ``i``, con el mismo formato que los documentos de Chroma."""
+        g, s, b, _ = self.medals(i)
+        prefix = f"En {self.editions[i]}, " if self.editions is not None else ""
+        return f"{prefix}{self.nations[i]} ganó {g} oros, {s} platas y {b} bronces."
+
+    def nation_summary(self, i):
+        """Resumen con las cifras exactas de un país y su posición oficial."""
+        g, s, b, t = self.medals(i)
+        rank = int(self.ranks[i])
+        rank_text = f" Ocupa la posición {rank} en el ranking." if rank != -1 else ""
+        prefix = f"En {self.editions[i]}, " if self.editions is not None else ""
+        return f"{prefix}{self.nations[i]} tiene {g} oros, {s} platas y {b} bronces (Total: {t})." + rank_text
+
+    def comparison_summary(self, rows, medal="Total"):
+        """Cifras de varios países y quién lidera según ``medal``."""
+        lines = [self.nation_summary(i) for i in rows]
+        leader = min(rows, key=lambda i: self.positions[medal][i])
+        lines.append(
+            f"En {MEDAL_NAMES[medal]}, {self.nations[leader]} lidera la comparación "
+            f"con {int(self.counts[medal][leader])}."
+        )
+        return "\n".join(lines)
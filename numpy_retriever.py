@@ -0,0 +1,115 @@
+"""Recuperación exacta en NumPy para colecciones pequeñas.
+
+La colección de medallas tiene unos cientos de documentos cortos; para eso no
+hace falta el cliente de Chroma con su índice HNSW. ``NumpyRetriever`` guarda
+los embeddings normalizados en una única matriz contigua, en float16 o en int8
+con un factor de escala por fila. Cada consulta es un producto escalar
+vectorizado más ``argpartition`` (top-k exacto por similitud coseno). Expone el
+mismo ``query()`` que usa ``rag.run_rag`` de una colección de Chroma.
+"""
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+# Filas por bloque al pasar la matriz a float32 para el producto (acota la memoria temporal)
+BLOCK_ROWS = 8192
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class NumpyRetriever:
+    """Matriz de embeddings cuantizada con búsqueda top-k exacta e interfaz ``query()`` como Chroma."""
+
+    def __init__(self, embeddings, documents, ids=None, metadatas=None, embedding_function=None, dtype="int8"):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype debe ser uno de {DTYPES}")
+        self.documents = list(documents)
+        self.ids = list(ids) if ids is not None else [str(i) for i in range(len(self.documents))]
+        self.metadatas = list(metadatas) if metadatas is not None else [None] * len(self.documents)
+        self.embedding_function = embedding_function
+        self.dtype = dtype
+
+        vectors = _normalize(embeddings) if len(self.documents) else np.zeros((0, 0), dtype=np.float32)
+        if dtype == "int8":
+            # Escala simétrica por fila: x ≈ q * scale con q en [-127, 127]
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            self.matrix = np.ascontiguousarray(np.round(vectors / scale[:, None]).astype(np.int8))
+            self.scale = scale.astype(np.float32)
+        else:
+            self.matrix = np.ascontiguousarray(vectors.astype(dtype))
+            self.scale = None
+
+    @classmethod
+    def from_collection(cls, collection, dtype="int8", embedding_function=None):
+        """Copia documentos, ids, metadatos y embeddings de una colección de Chroma.
+
+        Sin ``embedding_function`` se usa la compartida de ``embeddings`` para las consultas por texto.
+        """
+        if embedding_function is None:
+            from embeddings import get_embedding_function
+            embedding_function = get_embedding_function()
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        return cls(
+            data["embeddings"],
+            data["documents"],
+            ids=data["ids"],
+            metadatas=data["metadatas"],
+            embedding_function=embedding_function,
+            dtype=dtype,
+        )
+
+    def count(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        """Bytes de la matriz de embeddings (más las escalas en int8)."""
+        return self.matrix.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def scores(self, query_vectors):
+        """Similitud coseno (n_docs, n_consultas) de todas las filas con las consultas."""
+        q = _normalize(query_vectors).T
+        if not len(self.matrix):
+            return np.empty((0, q.shape[1]), dtype=np.float32)
+        if self.dtype == "float32":
+            return self.matrix @ q
+        out = np.empty((len(self.matrix), q.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.matrix), BLOCK_ROWS):
+            block = self.matrix[start:start + BLOCK_ROWS].astype(np.float32)
+            np.matmul(block, q, out=out[start:start + BLOCK_ROWS])
+        if self.scale is not None:
+            out *= self.scale[:, None]
+        return out
+
+    def top_k(self, query_vectors, k):
+        """Filas y similitudes de los ``k`` documentos más parecidos a cada consulta, ordenados."""
+        scores = self.scores(query_vectors)
+        k = min(k, len(scores))
+        if k == 0:
+            return np.empty((scores.shape[1], 0), dtype=np.intp), np.empty((scores.shape[1], 0), dtype=np.float32)
+        if k < len(scores):
+            part = np.argpartition(-scores, k - 1, axis=0)[:k]
+        else:
+            part = np.broadcast_to(np.arange(len(scores))[:, None], scores.shape)
+        part_scores = np.take_along_axis(scores, part, axis=0)
+        order = np.argsort(-part_scores, axis=0, kind="stable")
+        rows = np.take_along_axis(part, order, axis=0).T
+        return rows, np.take_along_axis(part_scores, order, axis=0).T
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=5, include=None):
+        """Misma forma de resultado que ``collection.query`` de Chroma (distancia = 1 - coseno)."""
+        if query_embeddings is None:
+            if self.embedding_function is None:
+                raise ValueError("Se necesita embedding_function para consultar por texto")
+            query_embeddings = self.embedding_function(list(query_texts))
+        rows, sims = self.top_k(query_embeddings, n_results)
+        return {
+            "ids": [[self.ids[i] for i in r] for r in rows],
+            "documents": [[self.documents[i] for i in r] for r in rows],
+            "metadatas": [[self.metadatas[i] for i in r] for r in rows],
+            "distances": (1.0 - sims).tolist(),
+        }
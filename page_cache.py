@@ -0,0 +1,145 @@
+"""Caché en disco de las páginas scrapeadas con revalidación ETag/Last-Modified.
+
+Los cuerpos se guardan direccionados por contenido (sha256) en ``blobs/`` y un
+índice JSON asocia cada URL con su blob, sus cabeceras de validación y los
+tiempos de descarga/acceso. Dentro del TTL no se hace ninguna petición; pasado
+el TTL se revalida con una petición condicional y un 304 reutiliza el cuerpo
+guardado. Cuando el total supera ``max_bytes`` se expulsan las URLs usadas hace
+más tiempo (LRU).
+"""
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+
+import requests
+
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", ".page_cache")
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "3600"))
+# Modo solo caché: no hace peticiones de red
+PAGE_CACHE_OFFLINE = os.getenv("PAGE_CACHE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# status: "fresh" (dentro del TTL), "not_modified" (304), "fetched" (200),
+# "offline" (modo solo caché) o "stale" (error de red, se sirve la copia guardada).
+# changed indica si el cuerpo es distinto del que había en caché.
+CachedPage = namedtuple("CachedPage", ["body", "status", "changed"])
+
+
+class PageCache:
+    """Caché de páginas HTML con TTL, revalidación condicional y expulsión LRU por tamaño."""
+
+    def __init__(self, directory=PAGE_CACHE_DIR, ttl=PAGE_CACHE_TTL, max_bytes=50 * 1024 * 1024,
+                 offline=PAGE_CACHE_OFFLINE, headers=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.headers = headers or {}
+        self._blobs = os.path.join(directory, "blobs")
+        self._index_path = os.path.join(directory, "index.json")
+        os.makedirs(self._blobs, exist_ok=True)
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blobs, f"{digest}.html")
+
+    def _read_blob(self, entry):
+        try:
+            with open(self._blob_path(entry["blob"]), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _save(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    def _touch(self, entry, body, status):
+        entry["last_access"] = time.time()
+        self._save()
+        return CachedPage(body, status, False)
+
+    def _drop_blob_if_unused(self, digest):
+        """Borra un blob que ya no referencia ninguna URL. Devuelve True si se borró."""
+        if any(e["blob"] == digest for e in self._index.values()):
+            return False
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        return True
+
+    def _evict(self):
+        """Expulsa las URLs menos usadas hasta que los blobs quepan en ``max_bytes``."""
+        sizes = {e["blob"]: e["size"] for e in self._index.values()}
+        total = sum(sizes.values())
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes or len(self._index) <= 1:
+                break
+            del self._index[url]
+            if self._drop_blob_if_unused(entry["blob"]):
+                total -= sizes[entry["blob"]]
+
+    def get(self, url, timeout=15):
+        """Devuelve un ``CachedPage`` para ``url``, revalidando con el servidor solo si hace falta.
+
+        En modo offline lanza LookupError si la URL no está en caché.
+        """
+        entry = self._index.get(url)
+        body = self._read_blob(entry) if entry else None
+        if body is None:
+            entry = None
+            if self.offline:
+                raise LookupError(f"{url} no está en la caché de páginas (modo offline)")
+        elif self.offline:
+            return self._touch(entry, body, "offline")
+        elif time.time() - entry["fetched_at"] < self.ttl:
+            return self._touch(entry, body, "fresh")
+
+        headers = dict(self.headers)
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            r = requests.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            if entry:
+                return self._touch(entry, body, "stale")
+            raise
+
+        now = time.time()
+        if r.status_code == 304 and entry:
+            entry["fetched_at"] = now
+            entry["etag"] = r.headers.get("ETag", entry.get("etag"))
+            entry["last_modified"] = r.headers.get("Last-Modified", entry.get("last_modified"))
+            return self._touch(entry, body, "not_modified")
+        r.raise_for_status()
+
+        new_body = r.content
+        digest = hashlib.sha256(new_body).hexdigest()
+        if not os.path.exists(self._blob_path(digest)):
+            with open(self._blob_path(digest), "wb") as f:
+                f.write(new_body)
+        changed = entry is None or entry["blob"] != digest
+        self._index[url] = {
+            "blob": digest,
+            "size": len(new_body),
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "last_access": now,
+        }
+        if changed and entry:
+            self._drop_blob_if_unused(entry["blob"])
+        self._evict()
+        self._save()
+        return CachedPage(new_body, "fetched", changed)
@@ -1,3 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 def query_vector_db(collection, query_text):
     """Consulta semántica en la base de datos vectorial"""
     results = collection.query(
@@ -5,6 +10,6 @@ def query_vector_db(collection, query_text):
         n_results=3
     )
 
-    print(f"\n🔎 Resultados para: '{query_text}'\n")
+    logger.info("🔎 Resultados para: '%s'", query_text)
     for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
-        print(f"🏅 {meta['nation']}: {doc}")
+        logger.info("🏅 %s: %s", meta["nation"], doc)
@@ -0,0 +1,219 @@
+"""Planificador de consultas estructuradas sobre el ranking de medallas.
+
+Convierte la pregunta en una intención (top-k por medalla, un país, comparación,
+rango de posiciones, "más oros que X" y filtro por edición) que se responde
+directamente con los arrays del ``MedalIndex``, sin embeddings ni Chroma. Solo
+las consultas que no encajan en ninguna intención (``intent == "search"``)
+pasan por la recuperación vectorial.
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from country_matcher import fold
+from medal_index import MEDAL_NAMES
+
+# Palabras (ya sin acentos y en minúsculas) que identifican cada tipo de medalla.
+# El orden importa: "medallas de oro" es Gold aunque también diga "medallas".
+MEDAL_KEYWORDS = {
+    "Gold": ("oro", "oros", "dorada", "doradas", "gold", "golds"),
+    "Silver": ("plata", "platas", "plateada", "plateadas", "silver", "silvers"),
+    "Bronze": ("bronce", "bronces", "bronze", "bronzes"),
+    "Total": ("total", "totales", "medalla", "medallas", "medal", "medals", "medallero"),
+}
+# Palabras de ranking: solas son ambiguas ("el mejor momento", "the first athlete"), así que
+# solo llevan al top con una medalla o un sujeto de ranking (SUBJECT_WORDS) en la consulta
+TOP_WORDS = frozenset((
+    "mejor", "mejores", "primer", "primero", "primeros", "primeras",
+    "lider", "lidera", "lideran", "best", "leader", "leads", "first",
+))
+# Comparativos: "dime más sobre el país anfitrión" no es un ranking; necesitan una medalla
+MOST_WORDS = frozenset(("mas", "more", "most", "maximo"))
+# Estas bastan por sí solas ("ranking de bronces", "top", "el medallero")
+RANKING_WORDS = frozenset(("top", "ranking", "clasificacion", "medallero", "leaderboard"))
+SUBJECT_WORDS = frozenset((
+    "pais", "paises", "nacion", "naciones", "delegacion", "delegaciones",
+    "country", "countries", "nation", "nations", "team", "teams",
+))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_YEAR = re.compile(r"\b(1[89]\d\d|20\d\d)\b")
+_TOP_K = (
+    re.compile(r"\btop\s*(\d{1,3})\b"),
+    re.compile(r"\b(\d{1,3})\s+(?:primeros|primeras|mejores|paises|naciones|countries|nations|first)\b"),
+    re.compile(r"\b(?:primeros|primeras|mejores|first|best)\s+(\d{1,3})\b"),
+)
+_RANK_RANGE = re.compile(
+    r"\b(?:puestos?|posicion(?:es)?|lugar(?:es)?|ranks?|positions?|places?)\s+"
+    r"(?:del?\s+|entre\s+(?:el\s+)?|from\s+|between\s+)?(\d{1,3})\s*(?:-|al?|hasta|y|to|and)\s*(?:el\s+)?(\d{1,3})\b"
+)
+# "más de 10 oros" -> umbral 11; "al menos 10" -> umbral 10
+_MORE_THAN_NUMBER = re.compile(r"\b(?:mas de|more than|over|mas que)\s+(\d{1,4})\b")
+_AT_LEAST_NUMBER = re.compile(r"\b(?:al menos|at least|minimo)\s+(\d{1,4})\b")
+_MORE_THAN_NATION = re.compile(r"\b(?:mas|more)\b.*\b(?:que|than)\b")
+
+Plan = namedtuple("Plan", "intent medal k rows rank_range threshold edition",
+                  defaults=(None, None, (), None, None, None))
+Plan.__doc__ = """Intención de una consulta.
+
+``medal`` es None si la consulta no nombra ningún tipo de medalla, ``rows`` son
+filas del índice (ya filtrado por ``edition``) y ``threshold`` el mínimo de
+medallas para "más ... que".
+"""
+
+
+def _tokens(folded):
+    return set(_TOKEN.findall(folded))
+
+
+def medal_type(query, default="Total"):
+    """Tipo de medalla de la consulta (Gold, Silver, Bronze o Total), con singulares, plurales e inglés."""
+    tokens = _tokens(fold(query))
+    for medal in ("Gold", "Silver", "Bronze", "Total"):
+        if tokens.intersection(MEDAL_KEYWORDS[medal]):
+            return medal
+    return default
+
+
+def _edition(folded, index):
+    """Edición de la consulta ("2024 Summer") en un índice con varias ediciones.
+
+    Si la consulta no menciona ningún año disponible se usa la edición más reciente, para no
+    mezclar ediciones en rankings y comparaciones. None si el índice no tiene ediciones.
+    """
+    if index.editions is None:
+        return None
+    available = set(index.editions)
+    m = _YEAR.search(folded)
+    if not m:
+        return max(available)
+    year = m.group(1)
+    tokens = _tokens(folded)
+    if tokens & {"invierno", "winter"}:
+        seasons = ("Winter",)
+    elif tokens & {"verano", "summer"}:
+        seasons = ("Summer",)
+    else:
+        seasons = ("Summer", "Winter")
+    for season in seasons:
+        if f"{year} {season}" in available:
+            return f"{year} {season}"
+    # Edición no disponible: la más reciente (la respuesta indica cuál se usó)
+    return max(available)
+
+
+def plan_query(query, index):
+    """Analiza ``query`` y devuelve un ``Plan``; ``intent == "search"`` si no se reconoce."""
+    folded = fold(query)
+    tokens = _tokens(folded)
+    edition = _edition(folded, index)
+    if edition is not None:
+        index = index.for_edition(edition)
+    explicit = medal_type(query, default=None)
+    # "medallas" a secas no fija el criterio (p. ej. ranking oficial en rangos de posiciones)
+    medal = explicit if explicit != "Total" or tokens & {"total", "totales"} else None
+
+    rows = index.matcher.find(query)
+    names = {index.nations[i] for i in rows}
+
+    if len(names) > 1:
+        return Plan("compare", medal, rows=tuple(rows), edition=edition)
+
+    m = _RANK_RANGE.search(folded)
+    if m:
+        lo, hi = sorted((int(m.group(1)), int(m.group(2))))
+        return Plan("rank_range", medal, rank_range=(max(lo, 1), hi), edition=edition)
+
+    if rows and _MORE_THAN_NATION.search(folded):
+        return Plan("more_than", medal, rows=tuple(rows[:1]), edition=edition)
+    if not rows:
+        m = _MORE_THAN_NUMBER.search(folded)
+        if m:
+            return Plan("more_than", medal, threshold=int(m.group(1)) + 1, edition=edition)
+        m = _AT_LEAST_NUMBER.search(folded)
+        if m:
+            return Plan("more_than", medal, threshold=int(m.group(1)), edition=edition)
+
+    if rows:
+        return Plan("nation", medal, rows=tuple(rows), edition=edition)
+
+    for pattern in _TOP_K:
+        m = pattern.search(folded)
+        if m and int(m.group(1)) > 0:
+            return Plan("top", medal, k=int(m.group(1)), edition=edition)
+    ranked = (
+        tokens & RANKING_WORDS
+        or (tokens & MOST_WORDS and explicit is not None)
+        or (tokens & TOP_WORDS and (explicit is not None or tokens & SUBJECT_WORDS))
+    )
+    if ranked:
+        return Plan("top", medal, edition=edition)
+
+    return Plan("search", medal, edition=edition)
+
+
+def _names(index, rows, limit=10):
+    names = [f"{index.nations[i]} ({int(v)})" for i, v in rows[:limit]]
+    extra = len(rows) - limit
+    return ", ".join(names) + (f" y {extra} más" if extra > 0 else "")
+
+
+def execute(plan, index):
+    """Responde un ``Plan`` estructurado a partir del ``MedalIndex`` (sin búsqueda vectorial)."""
+    if plan.edition is not None:
+        index = index.for_edition(plan.edition)
+    medal = plan.medal or "Total"
+    label = MEDAL_NAMES[medal]
+    counts = index.counts[medal]
+    prefix = f"En {plan.edition}: " if plan.edition is not None else ""
+
+    if plan.intent == "nation":
+        return "\n".join(index.nation_summary(i) for i in plan.rows)
+
+    if plan.intent == "compare":
+        return index.comparison_summary(list(plan.rows), medal)
+
+    if plan.intent == "top":
+        if plan.k is None:
+            top = index.top(medal, 3)
+            destacados = ", ".join(index.nations[i] for i in top[1:3])
+            return (
+                f"{prefix}A partir de los datos analizados, {index.nations[top[0]]} lidera en {label} "
+                f"con {int(counts[top[0]])}. "
+                f"Entre los países destacados también se encuentran {destacados}."
+            )
+        lines = [f"{pos}. {index.nations[i]}: {int(counts[i])}" for pos, i in enumerate(index.top(medal, plan.k), 1)]
+        return f"{prefix}Top {len(lines)} en {label}:\n" + "\n".join(lines)
+
+    if plan.intent == "rank_range":
+        lo, hi = plan.rank_range
+        if plan.medal is None and (index.ranks != -1).any():
+            # Sin tipo de medalla: posiciones del ranking oficial (con empates)
+            rows = np.flatnonzero((index.ranks >= lo) & (index.ranks <= hi))
+            rows = rows[np.argsort(index.ranks[rows], kind="stable")]
+            lines = [f"{int(index.ranks[i])}. {index.document(i)}" for i in rows]
+        else:
+            rows = index.orders[medal][lo - 1:hi]
+            lines = [f"{pos}. {index.nations[i]}: {int(counts[i])} {label}" for pos, i in enumerate(rows, lo)]
+        if not lines:
+            return f"{prefix}No hay países entre las posiciones {lo} y {hi}."
+        return f"{prefix}Posiciones {lo}-{hi}:\n" + "\n".join(lines)
+
+    if plan.intent == "more_than":
+        if plan.rows:
+            ref = plan.rows[0]
+            threshold = int(counts[ref]) + 1
+            condition = f"más {label} que {index.nations[ref]} ({int(counts[ref])})"
+        else:
+            threshold = plan.threshold
+            condition = f"al menos {threshold} {label}"
+        # El orden descendente precalculado hace que los que superan el umbral sean un prefijo
+        order = index.orders[medal]
+        n = int(np.count_nonzero(counts >= threshold))
+        if n == 0:
+            return f"{prefix}Ningún país tiene {condition}."
+        rows = [(i, counts[i]) for i in order[:n]]
+        return f"{prefix}{n} países tienen {condition}: {_names(index, rows)}."
+
+    raise ValueError(f"Intención no estructurada: {plan.intent}")
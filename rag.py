@@ -1,102 +1,147 @@
-import re
-import pandas as pd
+import logging
+import os
+
+from bm25 import reciprocal_rank_fusion
+from embedding_cache import QueryEmbeddingCache
+from medal_index import MedalIndex
+from query_planner import Plan, execute, medal_type, plan_query
+from telemetry import span, timed
+
+logger = logging.getLogger(__name__)
+
+# Caché de embeddings de consultas compartida por todo el proceso
+QUERY_CACHE = QueryEmbeddingCache()
+
+# Búsqueda híbrida: los resultados de Chroma se fusionan (RRF) con los de BM25 del MedalIndex
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1").lower() not in ("0", "false", "no")
+# Candidatos que aporta cada ranking (denso y BM25) antes de la fusión
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+
+# Codificador de consultas; None -> función de embeddings compartida (embeddings.py)
+_query_encoder = None
+
+
+def set_query_encoder(encode):
+    """Sustituye el codificador de consultas (p. ej. un ``EmbeddingBatcher``); None restaura el compartido."""
+    global _query_encoder
+    _query_encoder = encode
 
 def extract_medal_type(query: str):
-    """Detecta si la consulta habla de oros, platas o totales."""
-    query = query.lower()
-    if "oro" in query:
-        return "Gold"
-    elif "plata" in query:
-        return "Silver"
-    elif "bronce" in query:
-        return "Bronze"
+    """Detecta si la consulta habla de oros, platas, bronces o totales (también en plural e inglés)."""
+    return medal_type(query)
+
+def _retrieve(queries, collection, cache, n_results=5, index=None):
+    """Documentos de Chroma para cada consulta en una sola llamada a ``collection.query``.
+
+    Con ``cache`` los embeddings salen de la caché LRU (los fallos se codifican en
+    un único forward del modelo); sin ella Chroma codifica las consultas.
+    Con ``index`` la búsqueda es híbrida: los candidatos densos se fusionan por
+    RRF con los de BM25 (``index.lexical``) y se devuelven los ``n_results`` primeros.
+    """
+    n_dense = max(n_results, HYBRID_CANDIDATES) if index is not None else n_results
+    if cache is None:
+        with span("rag.retrieve", items=len(queries)):
+            results = collection.query(query_texts=queries, n_results=n_dense)
     else:
-        return "Total"
+        # Import diferido: las consultas estructuradas no necesitan chromadb ni el modelo
+        from embeddings import get_embedding_function
+
+        with span("rag.encode", items=len(queries)):
+            embeddings = cache.get_many(queries, _query_encoder or get_embedding_function())
+        with span("rag.retrieve", items=len(queries)):
+            results = collection.query(query_embeddings=embeddings, n_results=n_dense)
+    documents = results["documents"] if results["documents"] else [[] for _ in queries]
+    if index is None:
+        return documents
+    metadatas = results.get("metadatas") or [[None] * len(docs) for docs in documents]
+    with span("rag.lexical", items=len(queries)):
+        return [_fuse(q, docs, metas, index, n_results) for q, docs, metas in zip(queries, documents, metadatas)]
+
+
+def _fuse(query, docs, metadatas, index, n_results):
+    """Fusión RRF del ranking denso de Chroma con el de BM25 sobre las filas del índice.
+
+    Los resultados densos se identifican por su fila del índice (país y edición
+    de los metadatos) para que un mismo país encontrado por ambos caminos sume
+    las dos posiciones; si no está en el índice se conserva el documento tal cual.
+    """
+    dense = []
+    for doc, meta in zip(docs, metadatas):
+        row = index.find(meta["nation"], meta.get("edition")) if meta and "nation" in meta else None
+        dense.append(doc if row is None else row)
+    lexical, _ = index.lexical.search(query, HYBRID_CANDIDATES)
+    fused = reciprocal_rank_fusion([dense, lexical], limit=n_results)
+    return [key if isinstance(key, str) else index.document(key) for key in fused]
 
-def clean_country_name(name):
-    """Limpia símbolos como ‡, *, †."""
-    return re.sub(r"[‡*†]", "", str(name)).strip()
 
-def run_rag(query, collection, df):
+@timed("rag")
+def run_rag(query, collection, df, index=None, cache=QUERY_CACHE):
     """
     Ejecuta un flujo RAG mejorado:
-    - Usa ChromaDB para cumplir el pipeline.
-    - Usa los datos reales del DataFrame para mostrar los países correctos.
+    - Las preguntas estructuradas (top-k, país, comparación, rango de posiciones,
+      "más oros que X", edición) se responden directamente con el ``MedalIndex``
+      precalculado (``query_planner``), sin embeddings ni Chroma.
+      Si no se pasa ``index`` se construye a partir de ``df``.
+    - El resto usa la recuperación semántica de ChromaDB; el embedding de la
+      consulta sale de ``cache`` (None -> lo calcula Chroma). Con ``HYBRID_SEARCH``
+      los resultados se fusionan por RRF con los de BM25 (``bm25.py``), que sí
+      acierta con nombres, alias y cifras exactas.
     """
 
-    print(f"\n🧠 Ejecutando RAG para la consulta: '{query}'")
+    logger.info("🧠 Ejecutando RAG para la consulta: '%s'", query)
+
+    if index is None and df is not None and not df.empty:
+        index = MedalIndex.from_df(df)
+
+    # --- Consulta estructurada: respuesta directa desde las columnas ---
+    with span("rag.plan"):
+        plan = plan_query(query, index) if index is not None else None
+    if plan is not None and plan.intent != "search":
+        logger.info("🧭 Consulta estructurada (%s), sin búsqueda vectorial", plan.intent)
+        with span("rag.structured"):
+            return execute(plan, index)
 
-    # --- Recuperación semántica (por requisito RAG) ---
-    results = collection.query(query_texts=[query], n_results=5)
-    dummy_docs = results["documents"][0] if results["documents"] else []
+    # --- Recuperación híbrida (semántica + BM25) ---
+    docs = _retrieve([query], collection, cache, index=index if HYBRID_SEARCH else None)[0]
+    return _answer(query, docs, index)
 
-    # --- Determinar tipo de medalla que se consulta ---
-    medal_type = extract_medal_type(query)
 
-    # --- Verificar DataFrame ---
-    if df is None or df.empty:
-        print("⚠️ No se proporcionó DataFrame, usando solo recuperación semántica.")
-        docs = dummy_docs
+def run_rag_many(queries, collection, df, index=None, cache=QUERY_CACHE):
+    """Versión por lotes de ``run_rag`` para evaluaciones.
+
+    Las consultas estructuradas se responden desde el índice; para el resto se
+    codifican todos los fallos de caché en un solo forward del modelo y se hace
+    una única consulta multi-query a Chroma. Devuelve un resumen por consulta.
+    """
+    queries = list(queries)
+    if index is None and df is not None and not df.empty:
+        index = MedalIndex.from_df(df)
+    plans = [plan_query(q, index) if index is not None else None for q in queries]
+    pending = [i for i, plan in enumerate(plans) if plan is None or plan.intent == "search"]
+    hybrid = index if HYBRID_SEARCH else None
+    all_docs = _retrieve([queries[i] for i in pending], collection, cache, index=hybrid) if pending else []
+    answers = [None if plan is None or plan.intent == "search" else execute(plan, index) for plan in plans]
+    for i, docs in zip(pending, all_docs):
+        answers[i] = _answer(queries[i], docs, index)
+    return answers
+
+
+def _answer(query, docs, index):
+    """Resumen de una consulta no estructurada a partir de los documentos recuperados."""
+    if index is None:
+        logger.warning("⚠️ No se proporcionó DataFrame, usando solo recuperación semántica.")
+
+    if docs:
+        logger.debug("📚 Documentos recuperados:\n%s", "\n".join(f"- {d}" for d in docs))
+        summary = "Datos más relacionados con la consulta:\n" + "\n".join(f"- {d}" for d in docs[:3])
+    elif index is not None:
+        # Sin documentos: resumen del ranking general
+        summary = execute(Plan("top"), index)
+    else:
         summary = "No se pudo analizar el ranking real."
-        return summary
-
-    # --- Limpieza del DataFrame ---
-    df = df.copy()
-    df.columns = [c.strip().capitalize() for c in df.columns]
-    df = df[~df["Nation"].astype(str).str.contains("Total|–", case=False, na=False)]
-    df = df[df["Gold"].apply(lambda x: str(x).isdigit())]
-    df["Gold"] = df["Gold"].astype(int)
-    df["Silver"] = df["Silver"].astype(int)
-    df["Bronze"] = df["Bronze"].astype(int)
-    df["Total"] = df["Gold"] + df["Silver"] + df["Bronze"]
-
-    # --- Determinar top según tipo de medalla ---
-    top_df = df.sort_values(by=medal_type, ascending=False).head(5)
-    top_df["Nation"] = top_df["Nation"].apply(clean_country_name)
-
-    # --- Crear “documentos” coherentes con los datos ---
-    docs = [
-        f"{row.Nation} ganó {row.Gold} oros, {row.Silver} platas y {row.Bronze} bronces."
-        for _, row in top_df.iterrows()
-    ]
-
-    print("\n📚 Documentos recuperados:")
-    for d in docs:
-        print("-", d)
-
-    # --- Generar resumen ---
-    top_country = top_df.iloc[0]["Nation"]
-    top_value = top_df.iloc[0][medal_type]
-    destacados = ", ".join(top_df["Nation"].iloc[1:3].tolist())
-
-    summary = (
-        f"A partir de los datos analizados, {top_country} lidera en medallas de oro "
-        f"con {top_value} oros. "
-        f"Entre los países destacados también se encuentran {destacados}."
-    )
-
-    # --- Si la consulta pregunta por un país específico, devolver sus cifras exactas ---
-    q_lower = query.lower()
-    # Buscar coincidencias de país (comprobación simple, mayúsculas/minúsculas ignoradas)
-    for _, row in df.iterrows():
-        nation_clean = clean_country_name(row["Nation"]).lower()
-        if nation_clean and nation_clean in q_lower:
-            # Encontrado país en la consulta -> devolver conteo específico
-            g = int(row["Gold"])
-            s = int(row["Silver"])
-            b = int(row["Bronze"])
-            t = int(row["Total"])
-            rank = int(row.get("Rank", -1)) if "Rank" in row else -1
-            rank_text = f" Ocupa la posición {rank} en el ranking." if rank != -1 else ""
-            country_summary = (
-                f"{clean_country_name(row['Nation'])} tiene {g} oros, {s} platas y {b} bronces (Total: {t})."
-                + rank_text
-            )
-            return country_summary
-
-    print("\n🧾 Resumen generado:")
-    print(summary)
+
+    logger.info("🧾 Resumen generado:\n%s", summary)
 
     # Nota: el post-procesado con un LLM externo fue removido por decisión del proyecto.
     # Devolver solo el resumen generado a partir de los datos.
-    return summary
\ No newline at end of file
+    return summary
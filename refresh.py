@@ -0,0 +1,69 @@
+"""Refresco periódico de la tabla de medallas aplicando solo los cambios.
+
+``poll_medal_table`` revalida la página cada ``interval`` segundos con una
+petición condicional (``PageCache`` con ttl=0): si la página es la que ya está
+indexada no se parsea nada; si no, ``create_vector_db`` compara la tabla nueva
+con el snapshot y solo re-embebe las filas modificadas. Los errores (red, tabla
+mal formada) se registran, se sigue sirviendo lo anterior y el siguiente
+sondeo vuelve a intentarlo.
+"""
+import hashlib
+import logging
+import threading
+
+from page_cache import PageCache
+from scraper import HTTP_HEADERS, MEDAL_TABLE_URL, scrape_medal_table
+from vector_db import CHROMA_PATH, create_vector_db, indexed_source
+
+logger = logging.getLogger(__name__)
+
+
+def page_digest(page):
+    """Huella (sha256) del cuerpo de una página de ``PageCache``."""
+    return hashlib.sha256(page.body).hexdigest()
+
+
+def needs_reindex(page, persist_dir=CHROMA_PATH):
+    """True si el almacén no tiene aplicada esta versión de la página.
+
+    No basta con ``page.changed``: la caché guarda el cuerpo nuevo antes de
+    indexarlo, así que si el scraping o la ingesta fallan el siguiente sondeo
+    recibe un 304 y el cambio no se aplicaría nunca. La referencia es la huella
+    que ``create_vector_db`` guarda en el manifiesto al terminar.
+    """
+    return indexed_source(persist_dir) != page_digest(page)
+
+
+def refresh_once(cache, url=MEDAL_TABLE_URL, persist_dir=CHROMA_PATH):
+    """Revalida la página; devuelve (colección, DataFrame limpio) si había cambios por aplicar, o None."""
+    page = cache.get(url)
+    if not needs_reindex(page, persist_dir):
+        return None
+    df = scrape_medal_table(url, html=page.body)
+    return create_vector_db(df, persist_dir=persist_dir, source=page_digest(page))
+
+
+def poll_medal_table(interval, on_update, stop=None, url=MEDAL_TABLE_URL):
+    """Bucle de refresco: llama a ``on_update(collection, df_clean)`` tras cada cambio aplicado.
+
+    Termina cuando se activa ``stop`` (``threading.Event``).
+    """
+    stop = stop or threading.Event()
+    cache = PageCache(ttl=0, headers=HTTP_HEADERS)
+    while not stop.wait(interval):
+        try:
+            result = refresh_once(cache, url)
+        except Exception as e:
+            logger.warning("⚠️ Refresco de la tabla fallido, se mantienen los datos anteriores: %s", e)
+            continue
+        if result is not None:
+            on_update(*result)
+
+
+def start_polling(interval, on_update, url=MEDAL_TABLE_URL):
+    """Lanza ``poll_medal_table`` en un hilo; devuelve el ``Event`` que lo detiene."""
+    stop = threading.Event()
+    threading.Thread(
+        target=poll_medal_table, args=(interval, on_update, stop, url), name="medal-refresh", daemon=True
+    ).start()
+    return stop
@@ -1,31 +1,261 @@
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 import pandas as pd
 from io import StringIO
+import asyncio
+import re
+import logging
+import lxml.html
+import requests
 
-def scrape_medal_table():
-    """Hace scraping de la tabla de medallas de Wikipedia (Juegos Olímpicos 2024)"""
-    url = "https://en.wikipedia.org/wiki/2024_Summer_Olympics_medal_table"
+from telemetry import span
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url)
-        page.wait_for_load_state("networkidle")
-        html = page.content()
-        browser.close()
+logger = logging.getLogger(__name__)
+
+MEDAL_TABLE_URL = "https://en.wikipedia.org/wiki/2024_Summer_Olympics_medal_table"
+COLUMNS = ["Rank", "Nation", "Gold", "Silver", "Bronze", "Total"]
+
+# Ediciones celebradas (sin 1916, 1940 y 1944)
+SUMMER_EDITIONS = [
+    1896, 1900, 1904, 1908, 1912, 1920, 1924, 1928, 1932, 1936, 1948, 1952, 1956, 1960,
+    1964, 1968, 1972, 1976, 1980, 1984, 1988, 1992, 1996, 2000, 2004, 2008, 2012, 2016,
+    2020, 2024,
+]
+WINTER_EDITIONS = [
+    1924, 1928, 1932, 1936, 1948, 1952, 1956, 1960, 1964, 1968, 1972, 1976, 1980, 1984,
+    1988, 1992, 1994, 1998, 2002, 2006, 2010, 2014, 2018, 2022,
+]
+
+# Wikipedia rechaza peticiones sin User-Agent
+HTTP_HEADERS = {"User-Agent": "Scraping-con-Playwright-RAG/1.0 (medal table scraper)"}
+
+# Recursos que no hacen falta para leer la tabla
+BLOCKED_RESOURCES = {"image", "stylesheet", "font", "media"}
+
+
+def edition_url(year, season="Summer"):
+    """URL de Wikipedia de la tabla de medallas de una edición."""
+    return f"https://en.wikipedia.org/wiki/{year}_{season}_Olympics_medal_table"
+
+
+def edition_urls(seasons=("Summer", "Winter")):
+    """Diccionario {"2024 Summer": url, ...} con todas las ediciones de las temporadas indicadas."""
+    years = {"Summer": SUMMER_EDITIONS, "Winter": WINTER_EDITIONS}
+    return {f"{year} {season}": edition_url(year, season) for season in seasons for year in years[season]}
 
+
+def _normalize_columns(df):
+    """Normaliza las columnas a ["Rank", "Nation", "Gold", "Silver", "Bronze", "Total"]."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(-1)
+    if len(df.columns) == len(COLUMNS):
+        df.columns = COLUMNS
+    else:
+        # Tablas con columnas extra: emparejar por nombre de cabecera
+        keywords = {"Rank": "rank", "Nation": ("nation", "noc", "team"), "Gold": "gold",
+                    "Silver": "silver", "Bronze": "bronze", "Total": "total"}
+        rename = {}
+        for col in df.columns:
+            label = str(col).lower()
+            for target, keys in keywords.items():
+                if target not in rename.values() and label.startswith(keys):
+                    rename[col] = target
+                    break
+        df = df.rename(columns=rename)[COLUMNS]
+    return df
+
+
+def parse_medal_table(html):
+    """Extrae la tabla de medallas (clase wikitable) de un HTML y devuelve el DataFrame normalizado."""
     soup = BeautifulSoup(html, "html.parser")
 
     # Buscar la tabla de medallas
     table = soup.find("table", {"class": "wikitable"})
+    if table is None:
+        raise ValueError("No se encontró la tabla de medallas en el HTML")
     # pd.read_html will deprecate passing a literal HTML string in the future.
     # Wrap the HTML in a StringIO to keep compatibility.
     df = pd.read_html(StringIO(str(table)))[0]
 
     # Normalizar nombres de columnas
-    df.columns = ["Rank", "Nation", "Gold", "Silver", "Bronze", "Total"]
+    df = _normalize_columns(df)
     df = df.dropna(subset=["Nation"])
     df = df.reset_index(drop=True)
 
-    return df
\ No newline at end of file
+    return df
+
+
+def _span(cell, name):
+    """Valor entero de rowspan/colspan (Wikipedia a veces añade basura como "2;")."""
+    m = re.match(r"\s*(\d+)", cell.get(name, "1"))
+    return max(int(m.group(1)), 1) if m else 1
+
+
+def parse_medal_table_fast(html):
+    """Parser estático: localiza la tabla wikitable con lxml y construye el DataFrame en una pasada.
+
+    Acepta bytes o str. Expande rowspan/colspan (los empates de Rank usan rowspan)
+    sin re-serializar la tabla para ``pd.read_html``. Lanza ValueError si no hay tabla
+    o las filas no tienen el formato esperado.
+    """
+    root = lxml.html.fromstring(html)
+    tables = root.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " wikitable ")]')
+    if not tables:
+        raise ValueError("No se encontró la tabla de medallas en el HTML")
+
+    header = None
+    records = []
+    spans = {}  # columna -> [filas restantes, texto]
+    for tr in tables[0].iter("tr"):
+        cells = tr.xpath("./th|./td")
+        if not any(c.tag == "td" for c in cells):
+            # Cabecera (solo <th>); la fila de totales del pie también se descarta
+            if header is None and not records:
+                header = [" ".join(c.text_content().split()) for c in cells for _ in range(_span(c, "colspan"))]
+            continue
+
+        row = []
+        col = 0
+        remaining = iter(cells)
+        while True:
+            if col in spans:
+                spans[col][0] -= 1
+                row.append(spans[col][1])
+                if spans[col][0] == 0:
+                    del spans[col]
+                col += 1
+                continue
+            cell = next(remaining, None)
+            if cell is None:
+                break
+            text = " ".join(cell.text_content().split())
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                if rowspan > 1:
+                    spans[col] = [rowspan - 1, text]
+                row.append(text)
+                col += 1
+        records.append(row)
+
+    if not header or not records or any(len(r) != len(header) for r in records):
+        raise ValueError("La tabla de medallas no tiene el formato esperado")
+
+    df = _normalize_columns(pd.DataFrame(records, columns=header))
+    for col in ["Rank", "Gold", "Silver", "Bronze", "Total"]:
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().all():
+            df[col] = numeric
+    df = df[df["Nation"] != ""]
+    df = df.reset_index(drop=True)
+
+    return df
+
+
+def fetch_html(url=MEDAL_TABLE_URL, timeout=15):
+    """Descarga el HTML de una página con una petición HTTP simple (sin navegador)."""
+    with span("scrape.fetch") as s:
+        r = requests.get(url, headers=HTTP_HEADERS, timeout=timeout)
+        r.raise_for_status()
+        s.add(nbytes=len(r.content))
+    return r.content
+
+
+def scrape_with_browser(url=MEDAL_TABLE_URL):
+    """Carga la página en Chromium (Playwright) y parsea la tabla renderizada."""
+    # Playwright solo se importa si hace falta el navegador (el camino estático no lo usa)
+    from playwright.sync_api import sync_playwright
+
+    with span("scrape.browser") as s, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(url)
+        page.wait_for_load_state("networkidle")
+        html = page.content()
+        browser.close()
+        s.add(nbytes=len(html))
+
+    return parse_medal_table(html)
+
+
+def scrape_medal_table(url=MEDAL_TABLE_URL, html=None, cache=None):
+    """Hace scraping de la tabla de medallas de Wikipedia (Juegos Olímpicos 2024)
+
+    Camino rápido: HTML estático (``html`` ya descargado, de un fichero, de la
+    ``cache`` de páginas o una petición HTTP simple) parseado con lxml. Playwright
+    solo se usa si el camino estático falla.
+    """
+    with span("scrape") as s:
+        try:
+            if html is None:
+                html = cache.get(url).body if cache is not None else fetch_html(url)
+            with span("scrape.parse", nbytes=len(html)):
+                df = parse_medal_table_fast(html)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("⚠️ Parseo estático falló (%s); usando Playwright...", e)
+            df = scrape_with_browser(url)
+        s.add(items=len(df))
+        return df
+
+
+async def _block_heavy_resources(route):
+    """Aborta imágenes, CSS y fuentes; el resto de peticiones sigue su curso."""
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def scrape_medal_tables_async(urls, concurrency=8):
+    """Scrapea varias ediciones en paralelo con un único navegador y un pool de páginas.
+
+    ``urls`` es un diccionario {edición: url} (admite ``file://``). Como mucho
+    ``concurrency`` páginas se cargan a la vez. Devuelve un DataFrame combinado
+    con la columna ``Edition``; las ediciones que fallan se informan y se omiten.
+    """
+    from playwright.async_api import async_playwright
+
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    pool = asyncio.Queue()
+
+    async def fetch(edition, url):
+        async with semaphore:
+            page = await pool.get()
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                html = await page.content()
+            finally:
+                pool.put_nowait(page)
+        with span("scrape.parse", nbytes=len(html)):
+            try:
+                df = parse_medal_table_fast(html)
+            except ValueError:
+                # Estructura inesperada para el parser lxml: bs4 + read_html
+                df = parse_medal_table(html)
+        df.insert(0, "Edition", edition)
+        return df
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context()
+        await context.route("**/*", _block_heavy_resources)
+        for _ in range(min(concurrency, len(urls))):
+            pool.put_nowait(await context.new_page())
+
+        results = await asyncio.gather(
+            *(fetch(edition, url) for edition, url in urls.items()), return_exceptions=True
+        )
+        await browser.close()
+
+    frames = []
+    for edition, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.warning("⚠️ No se pudo scrapear %s: %s", edition, result)
+        else:
+            frames.append(result)
+    if not frames:
+        return pd.DataFrame(columns=["Edition"] + COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def scrape_editions(urls=None, concurrency=8):
+    """Versión síncrona de ``scrape_medal_tables_async`` (por defecto, todas las ediciones)."""
+    return asyncio.run(scrape_medal_tables_async(urls or edition_urls(), concurrency))
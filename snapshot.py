@@ -0,0 +1,129 @@
+"""Limpieza, validación y snapshot columnar de la tabla de medallas.
+
+La tabla se limpia una sola vez (``clean_medal_df``), se valida
+(``validate_medal_df``) y se guarda como fichero Arrow IPC (Feather v2) sin
+comprimir: medallas y Rank en int16, Nation y Edition codificados como
+diccionario. Al arrancar, ``read_snapshot`` lo abre con memory-map, así las
+columnas de medallas se leen sin copiarlas (ver ``MedalIndex.from_table``) y
+una tabla histórica de muchas ediciones ocupa poca RSS y carga en milisegundos.
+"""
+import os
+
+import numpy as np
+import pyarrow as pa
+
+MEDAL_COLUMNS = ["Gold", "Silver", "Bronze", "Total"]
+REQUIRED_COLUMNS = ["Rank", "Nation"] + MEDAL_COLUMNS
+INT16_MAX = np.iinfo(np.int16).max
+# Rank de las tablas que no traen columna Rank
+NO_RANK = -1
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("Rank", pa.int16()),
+    ("Nation", pa.dictionary(pa.int32(), pa.string())),
+    ("Gold", pa.int16()),
+    ("Silver", pa.int16()),
+    ("Bronze", pa.int16()),
+    ("Total", pa.int16()),
+])
+EDITION_FIELD = pa.field("Edition", pa.dictionary(pa.int32(), pa.string()))
+
+
+def clean_medal_df(df):
+    """Única pasada de limpieza: columnas, fila de totales, símbolos en nombres y tipos enteros."""
+    import pandas as pd
+
+    df = df.copy()
+    df.columns = [str(c).strip().capitalize() for c in df.columns]
+
+    # Quitar la fila de totales y limpiar símbolos especiales en nombres de países
+    df = df[~df["Nation"].astype(str).str.contains("Total|–", case=False, na=False)]
+    df["Nation"] = df["Nation"].astype(str).str.replace(r"[‡*†]", "", regex=True).str.strip()
+
+    # Limpiar y convertir Rank a número (NO_RANK si la tabla no trae Rank)
+    if "Rank" in df.columns:
+        df["Rank"] = pd.to_numeric(df["Rank"], errors="coerce")
+        df = df.dropna(subset=["Rank"])
+        df["Rank"] = df["Rank"].astype(int)
+    else:
+        df["Rank"] = NO_RANK
+
+    # Convertir las columnas de medallas a enteros
+    for col in MEDAL_COLUMNS[:3]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    if "Total" in df.columns:
+        df["Total"] = pd.to_numeric(df["Total"], errors="coerce").fillna(0).astype(int)
+    else:
+        df["Total"] = df["Gold"] + df["Silver"] + df["Bronze"]
+
+    if "Edition" in df.columns:
+        df["Edition"] = df["Edition"].astype(str)
+    return df.reset_index(drop=True)
+
+
+def validate_medal_df(df):
+    """Rechaza (ValueError) una tabla limpia mal formada antes de que llegue al índice.
+
+    Comprueba columnas, filas, nombres vacíos o repetidos (por edición), medallas
+    negativas o fuera de int16, Rank positivo (o ``NO_RANK``) y que Total sea la
+    suma de medallas (detecta columnas desplazadas por un parseo erróneo).
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en la tabla de medallas: {missing}")
+    if df.empty:
+        raise ValueError("La tabla de medallas está vacía.")
+    if (df["Nation"].astype(str).str.strip() == "").any():
+        raise ValueError("Hay países sin nombre en la tabla de medallas.")
+    key = ["Edition", "Nation"] if "Edition" in df.columns else ["Nation"]
+    duplicated = df[df.duplicated(subset=key)]
+    if not duplicated.empty:
+        raise ValueError(f"Países repetidos en la tabla de medallas: {duplicated['Nation'].head(5).tolist()}")
+    counts = df[MEDAL_COLUMNS].to_numpy()
+    if (counts < 0).any() or (counts > INT16_MAX).any():
+        raise ValueError("Número de medallas fuera de rango.")
+    ranks = df["Rank"]
+    if (((ranks < 1) & (ranks != NO_RANK)) | (ranks > INT16_MAX)).any():
+        raise ValueError("Rank fuera de rango.")
+    bad_total = df[df["Gold"] + df["Silver"] + df["Bronze"] != df["Total"]]
+    if not bad_total.empty:
+        raise ValueError(f"Total no coincide con oros + platas + bronces en: {bad_total['Nation'].head(5).tolist()}")
+    return df
+
+
+def to_arrow(df):
+    """Tabla Arrow tipada (int16 y diccionarios) a partir de la tabla limpia y validada."""
+    schema = SNAPSHOT_SCHEMA.insert(0, EDITION_FIELD) if "Edition" in df.columns else SNAPSHOT_SCHEMA
+    arrays = []
+    for field in schema:
+        values = pa.array(df[field.name].to_numpy() if field.name not in ("Nation", "Edition")
+                          else df[field.name].astype(str).tolist())
+        arrays.append(values.dictionary_encode() if pa.types.is_dictionary(field.type) else values.cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_snapshot(df, path):
+    """Guarda la tabla en formato Arrow IPC sin comprimir (apto para memory-map), de forma atómica."""
+    table = to_arrow(df)
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    return table
+
+
+def read_snapshot(path):
+    """Abre el snapshot con memory-map; las columnas apuntan al fichero sin copiarse."""
+    source = pa.memory_map(path, "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def snapshot_to_df(table):
+    """DataFrame con el mismo formato que ``clean_medal_df`` (nombres como texto, enteros nativos)."""
+    df = table.to_pandas()
+    for col in ("Nation", "Edition"):
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    for col in ["Rank"] + MEDAL_COLUMNS:
+        df[col] = df[col].astype(int)
+    return df
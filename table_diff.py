@@ -0,0 +1,85 @@
+"""Detección de cambios entre la tabla de medallas guardada y una recién scrapeada.
+
+Cada fila se identifica por el país (y la edición), no por su posición ni por su
+contenido, así una corrección en Wikipedia cambia una sola fila y un reordenamiento
+no cambia ninguna. ``diff_tables`` separa las filas añadidas, las que cambiaron
+de medallas (hay que re-embeber su documento), las que solo cambiaron de Rank
+(basta con actualizar metadatos) y las eliminadas; ``append_changelog`` deja
+constancia de cada cambio en un fichero JSON Lines.
+"""
+import json
+import re
+import time
+from collections import namedtuple
+
+from country_matcher import fold
+
+MEDAL_FIELDS = ["Gold", "Silver", "Bronze", "Total"]
+
+TableDiff = namedtuple("TableDiff", "added changed reranked removed entries")
+TableDiff.__doc__ = """Claves de fila por tipo de cambio y entradas del registro de cambios."""
+
+
+def slugify(text):
+    """Texto en minúsculas, sin acentos y con guiones: "Côte d'Ivoire" -> "cote-d-ivoire"."""
+    return re.sub(r"[^a-z0-9]+", "-", fold(str(text))).strip("-")
+
+
+def row_key(nation, edition=None):
+    """Identificador estable de una fila: país, precedido de la edición en tablas de varias ediciones."""
+    return f"{slugify(edition)}--{slugify(nation)}" if edition is not None else slugify(nation)
+
+
+def row_keys(df):
+    """Claves de todas las filas del DataFrame limpio, en orden."""
+    if "Edition" in df.columns:
+        return [row_key(n, e) for n, e in zip(df["Nation"], df["Edition"])]
+    return [row_key(n) for n in df["Nation"]]
+
+
+def _records(df):
+    fields = ["Rank", "Nation"] + MEDAL_FIELDS + (["Edition"] if "Edition" in df.columns else [])
+    rows = df[fields].to_dict("records")
+    return {key: {f: (int(r[f]) if f in MEDAL_FIELDS or f == "Rank" else r[f]) for f in fields}
+            for key, r in zip(row_keys(df), rows)}
+
+
+def diff_tables(old_df, new_df):
+    """Compara dos tablas limpias; ``old_df`` None equivale a una tabla vacía."""
+    old = _records(old_df) if old_df is not None else {}
+    new = _records(new_df)
+    added, changed, reranked, removed, entries = [], [], [], [], []
+    now = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    def entry(key, change, before, after):
+        row = after or before
+        entries.append({
+            "time": now, "key": key, "nation": row["Nation"], "edition": row.get("Edition"),
+            "change": change, "before": before, "after": after,
+        })
+
+    for key, row in new.items():
+        prev = old.get(key)
+        if prev is None:
+            added.append(key)
+            entry(key, "added", None, row)
+        elif any(prev[f] != row[f] for f in MEDAL_FIELDS):
+            changed.append(key)
+            entry(key, "changed", prev, row)
+        elif prev["Rank"] != row["Rank"]:
+            reranked.append(key)
+            entry(key, "rank", prev, row)
+    for key, row in old.items():
+        if key not in new:
+            removed.append(key)
+            entry(key, "removed", row, None)
+    return TableDiff(added, changed, reranked, removed, entries)
+
+
+def append_changelog(path, entries):
+    """Añade las entradas al registro de cambios (una línea JSON por cambio)."""
+    if not entries:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        for e in entries:
+            f.write(json.dumps(e, ensure_ascii=False) + "\n")
@@ -0,0 +1,231 @@
+"""Telemetría ligera del pipeline: spans por etapa con duración, conteos y bytes.
+
+``span("index.embed")`` mide un tramo del pipeline (scrape, index, rag, llm,
+tool...) y lo acumula por etapa: histograma de latencia
+(``http_client.LatencyHistogram``), elementos procesados, bytes y errores. Cada
+span cuesta un par de ``perf_counter`` y dos locks sin contención (~2-3 µs,
+frente a milisegundos por etapa), así que se deja siempre activo.
+
+- ``render_prometheus()``: todas las etapas, más las latencias del cliente HTTP,
+  en formato de texto de Prometheus; ``start_metrics_server()`` lo sirve en ``/metrics``.
+- ``profile()``: perfil de cProfile o pyinstrument (opcional) de un solo bloque,
+  p. ej. una petición.
+- ``configure_logging()``: nivel de log de la aplicación (``LOG_LEVEL``).
+"""
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import LatencyHistogram, get_client
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Puerto del endpoint /metrics (0 = desactivado)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_NAMESPACE = "medal_rag"
+PROFILERS = ("cprofile", "pyinstrument")
+
+_stages = {}
+_stages_lock = threading.Lock()
+
+
+class StageStats:
+    """Acumulado de una etapa: latencias, elementos, bytes y errores."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.items = 0
+        self.bytes = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, items, nbytes, failed):
+        self.latency.observe(seconds)
+        with self._lock:
+            self.items += items
+            self.bytes += nbytes
+            self.errors += failed
+
+    def snapshot(self):
+        with self._lock:
+            counters = {"items": self.items, "bytes": self.bytes, "errors": self.errors}
+        return {**self.latency.snapshot(), **counters}
+
+
+class Span:
+    """Tramo en curso; ``add()`` suma elementos y bytes procesados."""
+
+    __slots__ = ("name", "items", "bytes")
+
+    def __init__(self, name, items=0, nbytes=0):
+        self.name = name
+        self.items = items
+        self.bytes = nbytes
+
+    def add(self, items=0, nbytes=0):
+        self.items += items
+        self.bytes += nbytes
+
+
+def stage(name):
+    """Estadísticas de una etapa (se crean al usarla por primera vez)."""
+    stats = _stages.get(name)
+    if stats is None:
+        with _stages_lock:
+            stats = _stages.setdefault(name, StageStats())
+    return stats
+
+
+@contextmanager
+def span(name, items=0, nbytes=0):
+    """Mide el bloque y lo acumula en la etapa ``name``; una excepción cuenta como error."""
+    current = Span(name, items, nbytes)
+    failed = False
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        stage(name).record(time.perf_counter() - start, current.items, current.bytes, failed)
+
+
+def timed(name):
+    """Decorador: cada llamada a la función es un span de la etapa ``name``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def report():
+    """{etapa: {count, sum, buckets, items, bytes, errors}} de todas las etapas usadas."""
+    return {name: stats.snapshot() for name, stats in sorted(list(_stages.items()))}
+
+
+def reset():
+    """Olvida todas las etapas (entre ejecuciones de un benchmark)."""
+    with _stages_lock:
+        _stages.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(metric, label, key, snap):
+    lines = []
+    for bound, count in snap["buckets"]:
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{metric}_bucket{{{label}="{_label(key)}",le="{le}"}} {count}')
+    lines.append(f'{metric}_sum{{{label}="{_label(key)}"}} {snap["sum"]}')
+    lines.append(f'{metric}_count{{{label}="{_label(key)}"}} {snap["count"]}')
+    return lines
+
+
+def render_prometheus(namespace=METRICS_NAMESPACE):
+    """Etapas del pipeline y latencias HTTP por endpoint en formato de texto de Prometheus."""
+    stages = report()
+    lines = [
+        f"# HELP {namespace}_stage_seconds Duración de cada etapa del pipeline.",
+        f"# TYPE {namespace}_stage_seconds histogram",
+    ]
+    for name, snap in stages.items():
+        lines += _histogram_lines(f"{namespace}_stage_seconds", "stage", name, snap)
+    for field, help_text in (("items", "Elementos procesados"), ("bytes", "Bytes procesados"), ("errors", "Spans que terminaron en excepción")):
+        lines.append(f"# HELP {namespace}_stage_{field}_total {help_text} por etapa.")
+        lines.append(f"# TYPE {namespace}_stage_{field}_total counter")
+        lines += [f'{namespace}_stage_{field}_total{{stage="{_label(name)}"}} {snap[field]}' for name, snap in stages.items()]
+
+    lines.append(f"# HELP {namespace}_http_request_seconds Latencia de las peticiones HTTP (con reintentos) por endpoint.")
+    lines.append(f"# TYPE {namespace}_http_request_seconds histogram")
+    for endpoint, snap in sorted(get_client().latency_report().items()):
+        lines += _histogram_lines(f"{namespace}_http_request_seconds", "endpoint", endpoint, snap)
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Sirve ``/metrics`` en un hilo en segundo plano; devuelve el servidor (``shutdown()`` lo para)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+class ProfileCapture:
+    """Resultado de ``profile()``: informe en texto (disponible al salir del bloque)."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.report = ""
+
+
+@contextmanager
+def profile(kind="cprofile", path=None, limit=30):
+    """Perfila el bloque con cProfile o pyinstrument (``pip install pyinstrument``).
+
+    Al salir, ``capture.report`` tiene las ``limit`` funciones con más tiempo
+    acumulado (cProfile) o el árbol de llamadas (pyinstrument). Con ``path`` se
+    guarda además el perfil: ``.prof`` de cProfile (para snakeviz/pstats) o HTML
+    de pyinstrument. Solo ve el hilo que ejecuta el bloque.
+    """
+    if kind not in PROFILERS:
+        raise ValueError(f"kind debe ser uno de {PROFILERS}")
+    capture = ProfileCapture(kind)
+    if kind == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield capture
+        finally:
+            profiler.stop()
+            capture.report = profiler.output_text()
+            if path:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        capture.report = out.getvalue()
+        if path:
+            profiler.dump_stats(path)
+
+
+def configure_logging(level=LOG_LEVEL):
+    """Formato y nivel del logging de la aplicación (los módulos usan ``logging.getLogger(__name__)``)."""
+    logging.basicConfig(level=level.upper() if isinstance(level, str) else level,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
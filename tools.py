@@ -4,7 +4,13 @@ Incluye ejemplos sencillos: Wikipedia summary, NewsAPI headlines y OpenWeather c
 Estas funciones devuelven dict con 'success' y 'result' o 'error'.
 """
 import os
-import requests
+
+from http_client import get_client
+from telemetry import span
+
+# Permiten apuntar las tools a un servidor local (benchmarks/stub_server.py)
+NEWSAPI_BASE = os.getenv("NEWSAPI_BASE", "https://newsapi.org")
+OPENWEATHER_BASE = os.getenv("OPENWEATHER_BASE", "https://api.openweathermap.org")
 
 
 def newsapi_top_headlines(api_key: str, query: str = None):
@@ -17,10 +23,13 @@ def newsapi_top_headlines(api_key: str, query: str = None):
         params = {"apiKey": api_key, "pageSize": 5}
         if query:
             params["q"] = query
-        r = requests.get("https://newsapi.org/v2/top-headlines", params=params, timeout=6)
-        r.raise_for_status()
-        data = r.json()
-        articles = [f"{a.get('title')} - {a.get('source', {}).get('name')}" for a in data.get("articles", [])]
+        with span("tool.newsapi") as s:
+            r = get_client().get(f"{NEWSAPI_BASE}/v2/top-headlines", params=params, timeout=6,
+                                 endpoint="newsapi.top-headlines")
+            r.raise_for_status()
+            data = r.json()
+            articles = [f"{a.get('title')} - {a.get('source', {}).get('name')}" for a in data.get("articles", [])]
+            s.add(items=len(articles), nbytes=len(r.content))
         return {"success": True, "result": articles}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -32,9 +41,12 @@ def openweather_current(api_key: str, city: str):
         return {"success": False, "error": "No API key provided for OpenWeather"}
     try:
         params = {"appid": api_key, "q": city, "units": "metric", "lang": "es"}
-        r = requests.get("https://api.openweathermap.org/data/2.5/weather", params=params, timeout=6)
-        r.raise_for_status()
-        data = r.json()
+        with span("tool.openweather") as s:
+            r = get_client().get(f"{OPENWEATHER_BASE}/data/2.5/weather", params=params, timeout=6,
+                                 endpoint="openweather.weather")
+            r.raise_for_status()
+            data = r.json()
+            s.add(items=1, nbytes=len(r.content))
         desc = data.get("weather", [{}])[0].get("description")
         temp = data.get("main", {}).get("temp")
         return {"success": True, "result": f"{city}: {desc}, {temp}°C"}
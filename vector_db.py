@@ -1,82 +1,271 @@
 import os
-import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
+import json
+import logging
 from dotenv import load_dotenv
-import pandas as pd
+
+from medal_index import MedalIndex
+from query_planner import medal_type
+from snapshot import MEDAL_COLUMNS, clean_medal_df, read_snapshot, snapshot_to_df, validate_medal_df, write_snapshot
+from table_diff import append_changelog, diff_tables, row_keys
+from telemetry import span, timed
 
 load_dotenv()
 
-def create_vector_db(df):
-    """Crea una base de datos vectorial y limpia los datos de medallas olímpicas."""
+logger = logging.getLogger(__name__)
 
-    # 🧹 Limpieza general del DataFrame
-    df = df.copy()
+COLLECTION_NAME = "olympic_medals"
 
-    # Limpiar símbolos especiales en nombres de países
-    df["Nation"] = df["Nation"].astype(str).str.replace(r"[‡\*]", "", regex=True).str.strip()
+# Directorio del almacén persistente de Chroma. Vacío -> base de datos en memoria.
+CHROMA_PATH = os.getenv("CHROMA_PATH", "chroma_db")
+MANIFEST_FILE = "manifest.json"
+# Tabla limpia en Arrow IPC (int16 + diccionarios), se abre con memory-map
+SNAPSHOT_FILE = "medals.arrow"
+# Registro de cambios de la tabla (JSON Lines), junto al almacén
+CHANGELOG_FILE = "changes.jsonl"
 
-    # Limpiar y convertir Rank a número
-    df["Rank"] = pd.to_numeric(df["Rank"], errors="coerce")
-    df = df.dropna(subset=["Rank"])
-    df["Rank"] = df["Rank"].astype(int)
 
-    # Convertir las columnas de medallas a enteros
-    for col in ["Gold", "Silver", "Bronze", "Total"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+def build_documents(df):
+    """Construye documentos, ids y metadatos de forma vectorizada a partir del DataFrame limpio.
 
-    # Inicializar Chroma y forzar embeddings locales (SentenceTransformer)
-    chroma_client = chromadb.Client()
-    print("Forzando uso de modelo local (SentenceTransformer) para embeddings...")
-    embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
+    Los ids son la identidad de la fila (``table_diff.row_key``: país y, si la
+    hay, edición), así ni una corrección de medallas ni un reordenamiento cambian
+    los ids. Las filas repetidas se descartan.
+    """
+    documents = (
+        df["Nation"] + " ganó " + df["Gold"].astype(str) + " oros, "
+        + df["Silver"].astype(str) + " platas y "
+        + df["Bronze"].astype(str) + " bronces."
     )
+    # Tablas de varias ediciones (scraper.scrape_editions): la edición forma parte del documento
+    editions = df["Edition"].astype(str).tolist() if "Edition" in df.columns else [None] * len(df)
+    if "Edition" in df.columns:
+        documents = "En " + df["Edition"].astype(str) + ", " + documents
+    documents = documents.tolist()
+    ranks = df["Rank"].astype(int).tolist()
+    nations = df["Nation"].tolist()
+
+    rows = {}
+    for doc_id, doc, nation, rank, edition in zip(row_keys(df), documents, nations, ranks, editions):
+        metadata = {"nation": nation, "rank": rank}
+        if edition is not None:
+            metadata["edition"] = edition
+        rows.setdefault(doc_id, (doc, metadata))
+
+    ids = list(rows)
+    return [rows[i][0] for i in ids], ids, [rows[i][1] for i in ids]
+
+
+def _embedding_id():
+    # chromadb, pandas y el módulo embeddings se importan solo cuando hacen falta:
+    # leer el snapshot (load_medal_index) no los necesita (ver ``main.py ask``)
+    from embeddings import embedding_id
+    return embedding_id()
+
+
+def fingerprint_df(df, model_name=None):
+    """Huella (sha256) del DataFrame limpio más el identificador del modelo de embeddings."""
+    import pandas as pd
+
+    model_name = model_name or _embedding_id()
+    cols = ["Rank", "Nation"] + MEDAL_COLUMNS
+    if "Edition" in df.columns:
+        cols = ["Edition"] + cols
+    key = df[cols].astype({c: str for c in ("Edition", "Nation") if c in cols})
+    hashed = pd.util.hash_pandas_object(key, index=False)
+    digest = hashlib.sha256(hashed.to_numpy().tobytes())
+    digest.update(model_name.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_manifest(persist_dir):
+    """Lee el manifiesto del almacén persistente, o None si no existe."""
+    if not persist_dir:
+        return None
+    try:
+        with open(os.path.join(persist_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(persist_dir, df, fingerprint, count, source=None):
+    """Guarda el snapshot de la tabla limpia y el manifiesto junto al almacén de Chroma.
+
+    ``source`` es la huella de la página de la que sale la tabla (``refresh.page_digest``).
+    """
+    path = os.path.join(persist_dir, SNAPSHOT_FILE)
+    with span("index.snapshot", items=len(df)) as s:
+        write_snapshot(df, path)
+        s.add(nbytes=os.path.getsize(path))
+    manifest = {"fingerprint": fingerprint, "model": _embedding_id(), "count": count, "source": source}
+    with open(os.path.join(persist_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def indexed_source(persist_dir=CHROMA_PATH):
+    """Huella de la página indexada según el manifiesto, o None (sin almacén persistente o sin huella)."""
+    manifest = _read_manifest(persist_dir)
+    return manifest.get("source") if manifest else None
+
+
+def _read_snapshot_df(persist_dir):
+    """Tabla limpia guardada en el snapshot, o None si no existe."""
+    if not persist_dir:
+        return None
+    try:
+        return snapshot_to_df(read_snapshot(os.path.join(persist_dir, SNAPSHOT_FILE)))
+    except (OSError, ValueError):
+        return None
+
+
+def _open_collection(persist_dir):
+    """Abre (o crea) la colección, persistente si se indica un directorio."""
+    import chromadb
+    from embeddings import get_embedding_function
 
-    # Crear colección en Chroma
-    collection = chroma_client.get_or_create_collection(
-        name="olympic_medals",
-        embedding_function=embedding_fn
+    chroma_client = chromadb.PersistentClient(path=persist_dir) if persist_dir else chromadb.Client()
+    return chroma_client.get_or_create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=get_embedding_function()
     )
 
-    # Añadir documentos limpios
-    for idx, row in df.iterrows():
-        text = f"{row['Nation']} ganó {row['Gold']} oros, {row['Silver']} platas y {row['Bronze']} bronces."
-        collection.add(
-            documents=[text],
-            ids=[str(idx)],
-            metadatas=[{"nation": row["Nation"], "rank": int(row["Rank"])}]
-        )
 
-    print("✅ Base de datos vectorial creada correctamente.")
+def load_vector_db(persist_dir=CHROMA_PATH):
+    """Arranque en caliente: abre la colección persistida sin scrapear ni embeber.
+
+    Devuelve ``(collection, df)`` o None si no hay un almacén válido para el
+    modelo de embeddings actual.
+    """
+    manifest = _read_manifest(persist_dir)
+    if not manifest or manifest.get("model") != _embedding_id():
+        return None
+    df = _read_snapshot_df(persist_dir)
+    if df is None:
+        return None
+
+    collection = _open_collection(persist_dir)
+    if collection.count() != manifest.get("count"):
+        return None
+
+    logger.info("♻️ Base de datos vectorial cargada desde disco.")
     return collection, df
 
 
-def query_vector_db(collection, query, df, top_n=3):
+def load_medal_index(persist_dir=CHROMA_PATH):
+    """``MedalIndex`` sobre el snapshot memory-mapped (medallas sin copiar), o None si no existe."""
+    if not persist_dir:
+        return None
+    try:
+        return MedalIndex.from_table(read_snapshot(os.path.join(persist_dir, SNAPSHOT_FILE)))
+    except (OSError, ValueError):
+        return None
+
+
+@timed("index")
+def create_vector_db(df, batch_size=256, persist_dir=CHROMA_PATH, source=None):
+    """Crea o actualiza la base de datos vectorial con los datos de medallas olímpicas.
+
+    La actualización es incremental: la tabla nueva se compara con el snapshot
+    guardado (``table_diff.diff_tables``) y solo se re-embeben las filas
+    añadidas o con medallas distintas; a las que solo cambiaron de Rank se les
+    actualizan los metadatos y las que desaparecieron se borran. Los cambios se
+    registran en ``CHANGELOG_FILE``. La ingesta es por lotes de ``batch_size``
+    documentos (un solo forward del modelo y una sola escritura en Chroma por
+    lote). Sin snapshot (almacén en memoria) se compara con los documentos de
+    la colección. Si la huella de la tabla coincide con la guardada no se toca
+    la colección. ``source`` (huella de la página de origen) se guarda en el
+    manifiesto una vez aplicada la tabla (ver ``refresh.needs_reindex``).
+    """
+
+    # 🧹 Limpieza general del DataFrame (una sola vez) y validación del esquema
+    with span("index.clean", items=len(df)):
+        df = validate_medal_df(clean_medal_df(df))
+        fingerprint = fingerprint_df(df)
+
+    # Inicializar Chroma con embeddings locales (el modelo se carga al embeber el primer lote)
+    collection = _open_collection(persist_dir)
+
+    manifest = _read_manifest(persist_dir)
+    if manifest and manifest.get("fingerprint") == fingerprint and collection.count() == manifest.get("count"):
+        logger.info("✅ Base de datos vectorial sin cambios (huella coincidente).")
+        stale_source = source is not None and manifest.get("source") != source
+        if persist_dir and (stale_source or not os.path.exists(os.path.join(persist_dir, SNAPSHOT_FILE))):
+            _write_manifest(persist_dir, df, fingerprint, manifest["count"], source or manifest.get("source"))
+        return collection, df
+
+    documents, ids, metadatas = build_documents(df)
+    position = {doc_id: i for i, doc_id in enumerate(ids)}
+    existing = set(collection.get(include=[])["ids"])
+    if manifest and manifest.get("model") != _embedding_id():
+        # Vectores de otro modelo: no se puede reutilizar ninguno
+        if existing:
+            collection.delete(ids=list(existing))
+        existing = set()
+
+    # Cambios respecto a la tabla guardada
+    with span("index.diff", items=len(ids)):
+        old_df = _read_snapshot_df(persist_dir) if existing else None
+        diff = diff_tables(old_df, df)
+        kept = [i for i in ids if i in existing]
+        if old_df is None and kept:
+            stored = collection.get(ids=kept, include=["documents", "metadatas"])
+            to_embed = {i for i, doc in zip(stored["ids"], stored["documents"]) if doc != documents[position[i]]}
+            meta_only = {i for i, meta in zip(stored["ids"], stored["metadatas"]) if meta != metadatas[position[i]]}
+        elif old_df is None:
+            # Ninguna fila en común con la colección: todo se indexa de nuevo
+            to_embed, meta_only = set(), set()
+        else:
+            to_embed = set(diff.added) | set(diff.changed)
+            meta_only = set(diff.reranked)
+    to_embed |= set(ids) - existing
+    meta_only -= to_embed
+    stale = list(existing - set(ids))
+    if stale:
+        with span("index.delete", items=len(stale)):
+            collection.delete(ids=stale)
+
+    # Re-embeber por lotes solo lo añadido o modificado
+    pending = sorted(position[i] for i in to_embed)
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        batch_docs = [documents[i] for i in chunk]
+        with span("index.embed", items=len(chunk), nbytes=sum(len(d.encode("utf-8")) for d in batch_docs)):
+            collection.upsert(
+                documents=batch_docs,
+                ids=[ids[i] for i in chunk],
+                metadatas=[metadatas[i] for i in chunk]
+            )
+    # Solo cambió el Rank: el documento es el mismo, no hace falta el modelo
+    updates = sorted(position[i] for i in meta_only)
+    for start in range(0, len(updates), batch_size):
+        chunk = updates[start:start + batch_size]
+        with span("index.update", items=len(chunk)):
+            collection.update(ids=[ids[i] for i in chunk], metadatas=[metadatas[i] for i in chunk])
+
+    logger.info(
+        "✅ Base de datos vectorial actualizada (%d embebidos, %d con metadatos actualizados, "
+        "%d sin cambios, %d eliminados).",
+        len(pending), len(updates), len(ids) - len(pending) - len(updates), len(stale),
+    )
+    if persist_dir:
+        append_changelog(os.path.join(persist_dir, CHANGELOG_FILE), diff.entries)
+        _write_manifest(persist_dir, df, fingerprint, collection.count(), source)
+    return collection, df
+
+
+def query_vector_db(collection, query, df, top_n=3, index=None):
     """
     Consulta de ejemplo que devuelve los países correctos según el tipo de medalla.
+    Usa el ``MedalIndex`` precalculado (se construye a partir de ``df`` si no se pasa).
     """
-    query_lower = query.lower()
-    if "oro" in query_lower:
-        medal_col = "Gold"
-    elif "plata" in query_lower:
-        medal_col = "Silver"
-    elif "bronce" in query_lower:
-        medal_col = "Bronze"
-    else:
-        medal_col = "Total"
-
-    # Copia y limpieza del DataFrame
-    df_filtered = df.copy()
-    df_filtered = df_filtered[~df_filtered["Nation"].astype(str).str.contains("Total|–", na=False)]
-
-    # Asegurar valores numéricos
-    df_filtered[medal_col] = pd.to_numeric(df_filtered[medal_col], errors="coerce").fillna(0).astype(int)
-
-    # Ordenar por la medalla indicada
-    top_df = df_filtered.sort_values(by=medal_col, ascending=False).head(top_n)
-
-    print(f"\n🔎 Resultados para: '{query}'\n")
-    for _, row in top_df.iterrows():
-        print(
-            f"🏅 {row['Nation']}: {row['Nation']} ganó {row['Gold']} oros, "
-            f"{row['Silver']} platas y {row['Bronze']} bronces, Total: {row['Total']}"
-        )
+    medal_col = medal_type(query)
+
+    if index is None:
+        index = MedalIndex.from_df(df)
+
+    logger.info("🔎 Resultados para: '%s'", query)
+    for i in index.top(medal_col, top_n):
+        g, s, b, t = index.medals(i)
+        nation = index.nations[i]
+        logger.info("🏅 %s: %s ganó %d oros, %d platas y %d bronces, Total: %d", nation, nation, g, s, b, t)